@@ -0,0 +1,155 @@
+import re
+import logging
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+# "+3.45%", "−1.2%" (TradingView uses U+2212), "1.2M", "182.50 USD", "2.91T USD", "1,234.5"
+_NUMBER_RE = re.compile(r"^([+-]?)(\d+(?:\.\d+)?)([KMBT](?![a-z]))?")
+_SPACE_RE = re.compile(r"\s+")
+
+# Movers rows use snake_case keys; sector rows use the table's headers
+MOVER_COLUMNS = ["price", "change_percent", "volume"]
+SECTOR_COLUMNS = [
+    "Price", "Change %", "Volume", "Rel Volume", "Market cap", "P/E",
+    "EPS dil", "EPS dil growth", "Div yield %",
+]
+
+_COMPARATORS = {
+    ">": np.greater, ">=": np.greater_equal, "<": np.less,
+    "<=": np.less_equal, "==": np.equal, "!=": np.not_equal,
+}
+
+
+def parse_number(text) -> float:
+    """Parse a scraped cell into a float with K/M/B/T resolved; NaN when it isn't numeric."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    if not text:
+        return float("nan")
+    # Whitespace includes the narrow no-break spaces TradingView puts before suffixes
+    cleaned = _SPACE_RE.sub("", str(text)).replace("\u2212", "-").replace(",", "")
+    match = _NUMBER_RE.match(cleaned)
+    if not match:
+        return float("nan")
+    sign, digits, suffix = match.groups()
+    value = float(digits) * SUFFIXES.get(suffix, 1.0)
+    return -value if sign == "-" else value
+
+
+def parse_column(values) -> np.ndarray:
+    return np.fromiter((parse_number(v) for v in values), dtype=np.float64)
+
+
+def _clean_float(value: float) -> float | None:
+    # NaN/inf are not valid JSON
+    return round(float(value), 4) if np.isfinite(value) else None
+
+
+class NumericTable:
+    """
+    Scraped records plus typed float64 columns parsed once on first use. Queries return the
+    original records, so responses keep the page's formatting.
+    """
+
+    def __init__(self, records: list[dict]):
+        self.records = records
+        self._columns: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            self._columns[name] = parse_column(record.get(name) for record in self.records)
+        return self._columns[name]
+
+    def _take(self, indices) -> list[dict]:
+        return [self.records[i] for i in indices]
+
+    def top_k(self, name: str, k: int) -> list[dict]:
+        """Rows with the largest values; unparsable cells sort last."""
+        values = np.where(np.isnan(self.column(name)), -np.inf, self.column(name))
+        return self._take(np.argsort(-values, kind="stable")[:k])
+
+    def bottom_k(self, name: str, k: int) -> list[dict]:
+        """Rows with the smallest values; unparsable cells sort last."""
+        values = np.where(np.isnan(self.column(name)), np.inf, self.column(name))
+        return self._take(np.argsort(values, kind="stable")[:k])
+
+    def extreme(self, name: str, largest: bool = True) -> tuple[dict, float] | None:
+        """(record, value) with the largest or smallest parsed value, or None if none parse."""
+        values = self.column(name)
+        if not values.size or np.isnan(values).all():
+            return None
+        index = int(np.nanargmax(values) if largest else np.nanargmin(values))
+        return self.records[index], float(values[index])
+
+    def filter(self, name: str, op: str, value: float) -> "NumericTable":
+        if op not in _COMPARATORS:
+            raise ValueError(f"Unsupported comparison '{op}'")
+        values = self.column(name)
+        mask = _COMPARATORS[op](values, value) & ~np.isnan(values)
+        return NumericTable(self._take(np.flatnonzero(mask)))
+
+    def aggregate(self, name: str) -> dict:
+        values = self.column(name)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return {"count": 0}
+        return {
+            "count": int(values.size),
+            "sum": _clean_float(values.sum()),
+            "mean": _clean_float(values.mean()),
+            "median": _clean_float(np.median(values)),
+            "min": _clean_float(values.min()),
+            "max": _clean_float(values.max()),
+        }
+
+    def summary(self, names: list[str]) -> dict:
+        aggregates = {name: self.aggregate(name) for name in names if any(name in r for r in self.records)}
+        return {name: agg for name, agg in aggregates.items() if agg["count"]}
+
+
+def numeric_columns(records: list[dict]) -> list[str]:
+    """Columns, in table order, with at least one cell that parses as a number."""
+    table = NumericTable(records)
+    names = dict.fromkeys(name for record in records for name in record)
+    return [name for name in names if not np.isnan(table.column(name)).all()]
+
+
+def resolve_column(records: list[dict], name: str) -> str | None:
+    """The numeric column `name` refers to, matched case-insensitively; None if there is none."""
+    wanted = name.strip().casefold()
+    return next((column for column in numeric_columns(records) if column.casefold() == wanted), None)
+
+
+def rank_rows(records: list[dict], column: str, order: str = "desc", k: int | None = None) -> list[dict]:
+    """Best (`desc`) or worst (`asc`) k rows by a numeric column; ValueError if it isn't one."""
+    resolved = resolve_column(records, column)
+    if resolved is None:
+        raise ValueError(f"Cannot rank by '{column}'; numeric columns are: {', '.join(numeric_columns(records))}")
+    column = resolved
+    table = NumericTable(records)
+    k = len(records) if k is None else k
+    return table.bottom_k(column, k) if order == "asc" else table.top_k(column, k)
+
+
+def sector_summary(records: list[dict], change_column: str = "Change %") -> dict:
+    """Column aggregates plus breadth (advancers/decliners) for a sector table."""
+    table = NumericTable(records)
+    summary = {"rows": len(records), "columns": table.summary(SECTOR_COLUMNS)}
+    if any(change_column in record for record in records):
+        change = table.column(change_column)
+        summary["advancers"] = int(np.count_nonzero(change > 0))
+        summary["decliners"] = int(np.count_nonzero(change < 0))
+        best = table.top_k(change_column, 1)
+        worst = table.bottom_k(change_column, 1)
+        if best:
+            summary["best"] = {"Symbol": best[0].get("Symbol"), change_column: best[0].get(change_column)}
+        if worst:
+            summary["worst"] = {"Symbol": worst[0].get("Symbol"), change_column: worst[0].get(change_column)}
+    return summary
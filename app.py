@@ -1,10 +1,18 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
+import re
+import copy
+import time
+import uuid
+import hashlib
 import json
+import asyncio
 import logging
+import sqlite3
+from contextvars import ContextVar
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
@@ -12,9 +20,31 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel as PydanticBaseModel, Field
-from sel import get_driver, scrape_stocks, click_element, scrape_single_stock, scrape_stock_news, scrape_sector, display_stock_chart 
+from sel import scrape_stocks, scrape_single_stock, scrape_stock_news, scrape_sector, display_stock_chart, sector_url, set_resource_blocking
+from http_engine import http_engine
+from driver_pool import driver_pool
+from cache import table_cache
+from plan_cache import plan_cache, normalize_prompt, PLAN_ACTION_KEYS
+from router import fast_router, SECTORS, GAINERS_URL, LOSERS_URL, SYMBOL_URL
+from prefetch import (
+    Prefetcher, PREFETCH_TABLE_ROWS, PREFETCH_MOVERS_INTERVAL, PREFETCH_SECTORS_INTERVAL,
+    PREFETCH_WATCHLIST, PREFETCH_WATCHLIST_INTERVAL
+)
+from images import ChartOptions, deliver_chart, chart_image_store
+from singleflight import scrape_flight, llm_flight
+from refine_payload import compact_payload, estimate_tokens
+from formatter import format_response, use_llm_refine
+from analytics import NumericTable, rank_rows, resolve_column, numeric_columns, sector_summary, MOVER_COLUMNS
+from snapshots import snapshot_store, since_timestamp
+from progress import report_progress, set_progress_listener, reset_progress_listener
+from metrics import (
+    span, start_trace, reset_trace, timing_breakdown, observe_request, render_metrics,
+    REQUEST_ID_HEADER, CONTENT_TYPE_LATEST
+)
+from llm_client import llm_client, LLM_TIMEOUT, LLM_MAX_RETRIES
+from executors import browser_executor, http_executor, endpoint_limiter, run_with_driver, executor_stats, shutdown_executors
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +57,10 @@ if not api_key:
     logger.error("GOOGLE_GEMINI_KEY environment variable not set")
     raise ValueError("GOOGLE_GEMINI_KEY environment variable not set")
 
+# Multi-ticker comparisons: concurrent browser sessions per request, and max tickers
+COMPARE_FANOUT_LIMIT = int(os.getenv("COMPARE_FANOUT_LIMIT", "3"))
+COMPARE_MAX_TICKERS = int(os.getenv("COMPARE_MAX_TICKERS", "6"))
+
 # Initialize FastAPI app
 app = FastAPI()
 
@@ -37,11 +71,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[REQUEST_ID_HEADER],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Every request gets an ID and a trace that stage spans (in any executor thread) append to
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    token = start_trace(request_id, request.url.path)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+    finally:
+        # Streaming responses are timed to their first byte; their spans keep arriving afterwards
+        route = request.scope.get("route")
+        observe_request(getattr(route, "path", "unmatched"), status, time.perf_counter() - start)
+        reset_trace(token)
+
 # Define request model
 class Query(BaseModel):
     prompt: str
+    use_plan_cache: bool = True
+    chart: ChartOptions = ChartOptions()
+    debug: bool = False  # attach the per-stage timing breakdown to the response
+    refine: bool | None = None  # True: always refine with the LLM, False: template only, None: per intent
 
 # Initialize LangChain Gemini model
 try:
@@ -49,7 +106,10 @@ try:
         model="gemini-1.5-pro",
         google_api_key=api_key,
         temperature=0.2,
-        max_output_tokens=1000
+        max_output_tokens=1000,
+        # One client for every chat turn; its async transport is created once and reused
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES
     )
 except Exception as e:
     logger.error(f"Failed to initialize Gemini model with LangChain: {str(e)}")
@@ -60,9 +120,14 @@ class Action(PydanticBaseModel):
     action: str = Field(description="The action to perform (e.g., navigate, click, extract, display_chart)")
     selector: str = Field(description="CSS selector for the element", default="")
     url: str = Field(description="URL for navigation", default="")
-    count: int = Field(description="Number of elements to extract", default=0)
+    count: int | str = Field(description="Number of elements to extract (or 'all' for sectors)", default=0)
     ticker: str = Field(description="Stock ticker for chart display", default="")
     timeframe: str = Field(description="Timeframe for chart display", default="1Y")
+    symbol: str = Field(description="Stock ticker for news", default="")
+    sector: str = Field(description="Sector name for sector data", default="")
+    fields: dict = Field(description="Field name to CSS selector mapping for extraction", default={})
+    sort_by: str = Field(description="Numeric column to rank sector rows by (e.g. 'Change %')", default="")
+    order: str = Field(description="'desc' for best/highest first, 'asc' for worst/lowest first", default="desc")
 
 class ActionsResponse(PydanticBaseModel):
     actions: list[Action] = Field(description="List of actions to perform", default=[])
@@ -72,6 +137,14 @@ class ActionsResponse(PydanticBaseModel):
     actions_chart: list[Action] = Field(description="List of actions for chart display", default=[])
     message: str = Field(description="Optional message for invalid prompts", default="")
 
+# Request model for executor endpoints: pass an already parsed plan to skip re-planning
+class PlanQuery(BaseModel):
+    prompt: str = ""
+    plan: ActionsResponse | None = None
+    use_plan_cache: bool = True
+    chart: ChartOptions = ChartOptions()
+    debug: bool = False
+
 prompt_template = PromptTemplate(
     input_variables=["user_prompt"],
     template="""
@@ -127,6 +200,10 @@ prompt_template = PromptTemplate(
                 - Second span = (corresponding % change)
         - If ticker is invalid, return {{"actions": [], "message": "Invalid stock ticker"}}.
 
+    3a. **Comparing Several Stocks**
+        - If the user asks to compare stocks (e.g., "compare AAPL, MSFT and NVDA"), add one
+          "navigate_single" + "extract_single" pair per ticker to "actions_single", in the order asked.
+
     4. **Search for Stock**
        - Type stock name/ticker into: "input[name='query']"
        - Click search result: "a[class*='search-result']"
@@ -173,6 +250,9 @@ prompt_template = PromptTemplate(
        If the user asks about different stock sectors like Technology, Energy, Finance, etc.:
        1. Identify the correct sector name from the user's query (match against valid TradingView sectors).
        2. Respond with an action to fetch that sector's data. If user asks for top N, include "count".
+       3. If the user asks for the best/worst performers or the highest/lowest by a metric, include "sort_by"
+          (a column such as "Change %", "Market cap", "Volume", "P/E") and "order" ("desc" or "asc").
+          Ranking is done by the server; do not try to rank rows yourself.
        Valid sectors: ["Commercial services", "Communications", "Consumer durables", "Consumer non-durables", 
        "Consumer services", "Distribution services", "Electronic technology", "Energy minerals", "Finance", 
        "Government", "Health services", "Health technology", "Industrial services", "Miscellaneous", 
@@ -189,6 +269,19 @@ prompt_template = PromptTemplate(
            ]
        }}
 
+       Example (5 Worst Performing Finance Stocks):
+       {{
+           "action_sector": [
+               {{
+                   "action": "fetch_sector_data",
+                   "sector": "Finance",
+                   "count": 5,
+                   "sort_by": "Change %",
+                   "order": "asc"
+               }}
+           ]
+       }}
+
     Example (Best Performing Stock):
     {{
         "actions": [
@@ -244,28 +337,180 @@ prompt_template = PromptTemplate(
 parser = JsonOutputParser(pydantic_object=ActionsResponse)
 chain = prompt_template | llm | parser
 
+def record_snapshot(key: tuple, value):
+    # Table cache keys name what was scraped: ("movers", url, n), ("sector", sector, n), ("single", ticker)
+    kind = key[0]
+    if kind == "movers":
+        snapshot_store.record_movers(key[1], value)
+    elif kind == "sector":
+        snapshot_store.record_sector(key[1], value)
+    elif kind == "single" and value and value.get("stocks"):
+        snapshot_store.record_single(key[1], value["stocks"][0])
+
+# Background refresh of hot pages into the same table cache the endpoints read from
+prefetcher = Prefetcher(table_cache)
+
+def schedule_prefetch_jobs():
+    for name, url in (("gainers", GAINERS_URL), ("losers", LOSERS_URL)):
+        prefetcher.add(
+            name, ("movers", url, PREFETCH_TABLE_ROWS), PREFETCH_MOVERS_INTERVAL,
+            load_mover_rows, url, PREFETCH_TABLE_ROWS, browser=prefetcher.run_with_driver
+        )
+    for sector in SECTORS:
+        prefetcher.add(
+            f"sector:{sector}", ("sector", sector.lower(), str(PREFETCH_TABLE_ROWS)), PREFETCH_SECTORS_INTERVAL,
+            load_sector_rows, sector, PREFETCH_TABLE_ROWS, browser=prefetcher.run_with_driver
+        )
+    for ticker in PREFETCH_WATCHLIST:
+        prefetcher.add(
+            f"ticker:{ticker}", ("single", ticker), PREFETCH_WATCHLIST_INTERVAL,
+            load_watchlist_stock, ticker, browser=prefetcher.run_with_driver
+        )
+
+@app.on_event("startup")
+async def startup():
+    # Pre-warm the browser pool so the first requests don't pay Chrome startup
+    await asyncio.to_thread(driver_pool.prewarm)
+    logger.info(f"Driver pool ready: {driver_pool.stats()}")
+    snapshot_store.start()
+    schedule_prefetch_jobs()
+    prefetcher.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await prefetcher.stop()
+    # Flush queued snapshots before the process exits
+    await asyncio.to_thread(snapshot_store.stop)
+    shutdown_executors()
+    driver_pool.close()
+
+async def prefetched_rows(key: tuple, count):
+    # Prefetched tables hold PREFETCH_TABLE_ROWS rows; smaller requests are served by slicing
+    try:
+        limit = int(count)
+    except (TypeError, ValueError):
+        return None
+    if limit <= 0 or limit > PREFETCH_TABLE_ROWS:
+        return None
+    cached = await table_cache.aget(key)
+    if cached is None:
+        return None
+    rows, data_age = cached
+    return rows[:limit], data_age
+
+@app.get("/chart_image/{token}")
+async def get_chart_image(token: str, request: Request):
+    image = await chart_image_store.aget(token)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Chart image expired or not found")
+    data, media_type, etag, seconds_left = image
+    headers = {
+        "Cache-Control": f"private, max-age={int(seconds_left)}, immutable",
+        "ETag": f'"{etag}"',
+    }
+    if request.headers.get("if-none-match") == f'"{etag}"':
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=media_type, headers=headers)
+
+@app.get("/executor_stats")
+async def get_executor_stats():
+    # Queue depth and wait times for browser/HTTP executors, in-flight LLM calls and endpoint semaphores
+    return executor_stats()
+
+@app.get("/router_stats")
+async def get_router_stats():
+    return fast_router.stats()
+
+@app.get("/cache_stats")
+async def get_cache_stats():
+    # Shared backends count entries with a query, so the stats are gathered off the event loop
+    def collect():
+        return {"table": table_cache.stats(), "plan": plan_cache.stats(), "chart_image": chart_image_store.stats()}
+    return await asyncio.to_thread(collect)
+
+@app.get("/prefetch_stats")
+async def get_prefetch_stats():
+    return prefetcher.stats()
+
+@app.get("/dedup_stats")
+async def get_dedup_stats():
+    # How many scrapes and LLM calls were served by joining identical in-flight work
+    return {"scrape": scrape_flight.stats(), "llm": llm_flight.stats()}
+
+@app.get("/snapshot_stats")
+async def get_snapshot_stats():
+    return snapshot_store.stats()
+
+@app.get("/engine_stats")
+async def get_engine_stats():
+    return {"http": http_engine.stats()}
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus exposition: per-stage and per-endpoint latency histograms, request counters
+    payload = render_metrics()
+    if payload is None:
+        raise HTTPException(status_code=503, detail="prometheus-client is not installed")
+    return Response(content=payload, media_type=CONTENT_TYPE_LATEST)
+
+def with_timings(response, debug: bool):
+    # Debug responses carry the request's stage timeline under "debug"
+    if debug and isinstance(response, dict):
+        response["debug"] = {"timings": timing_breakdown()}
+    return response
+
+async def plan_actions(prompt: str) -> dict:
+    # Run the planning chain once per chat turn; executors receive the parsed plan
+    actions_data = await llm_client.ainvoke(chain, {"user_prompt": prompt})
+    logger.info(f"LangChain LLM response: {json.dumps(actions_data, indent=2)}")
+    return actions_data
+
+async def get_plan(prompt: str, use_cache: bool = True) -> dict:
+    # Common intents are planned by rules; only unmatched prompts reach the LLM
+    routed = fast_router.route(prompt)
+    if routed is not None:
+        return routed
+
+    # Repeat questions reuse a cached plan and skip the planner entirely
+    if use_cache:
+        cached = await plan_cache.aget(prompt)
+        if cached is not None:
+            return cached
+    # Identical prompts planned concurrently share one LLM call
+    template, numbers = normalize_prompt(prompt)
+    with span("plan_llm"):
+        actions_data = await llm_flight.do(
+            ("plan", template, tuple(numbers)),
+            lambda: plan_actions(prompt),
+            copy_result=True
+        )
+    if use_cache:
+        await plan_cache.aset(prompt, actions_data)
+    return actions_data
+
+async def resolve_plan(request: PlanQuery) -> dict:
+    if request.plan is not None:
+        return request.plan.model_dump()
+    if not request.prompt:
+        raise HTTPException(status_code=400, detail="Either 'prompt' or 'plan' is required")
+    return await get_plan(request.prompt, request.use_plan_cache)
+
 @app.get("/")
 async def root():
     return {"message": "TradingView FastAPI is running"}
 
-@app.post("/llm_refine")
-async def llm_refine(request: Query):
-    """
-    Endpoint that first calls /llm_action, then refines its response using the LLM.
-    """
-    try:
-        # Step 1: Get the raw structured output from /llm_action
-        raw_output = await llm_action(request)
-
-        # Step 2: Prepare refinement prompt for the LLM
-        refine_prompt = f"""
+def build_refine_prompt(prompt: str, raw_output) -> str:
+    # Compact, token-bounded text instead of indented JSON keeps refine latency flat
+    payload = compact_payload(raw_output)
+    logger.info(f"Refine payload: ~{estimate_tokens(payload)} tokens")
+    return f"""
             You are EyeOnStox, a stock assistant created by Rawat Ji and Rathour Saab.
             who is given data from trading view website you analyze that data and answer from that data only.
             Do not use you own knowledge, only use the data provided. and don't answer anything unrelated. 
-            The user asked: '{request.prompt}'
-            Here is the structured system response provided:
+            The user asked: '{prompt}'
+            Here is the structured system response provided (tables are pipe-separated, one row per line):
 
-            {json.dumps(raw_output, indent=2)}
+            {payload}
             If it's normal greeting or chitchat then respond in a friendly manner but don't guess any values.
             If its a unrelated question, then respond in a friendly manner.
             Your task:
@@ -301,26 +546,124 @@ async def llm_refine(request: Query):
             - Displaying {{ticker}} ({{timeframe}}) chart. Close the browser manually.
 
             If the data is not available, say "Data not available".
-        """
+    """
 
-        refined = llm.invoke(refine_prompt)
+@app.post("/llm_refine")
+async def llm_refine(request: Query):
+    """
+    Endpoint that first calls /llm_action, then refines its response using the LLM.
+    """
+    async with endpoint_limiter.limit("llm_refine"):
+        return await refine_prompt_response(request)
+
+async def refine_prompt_response(request: Query):
+    try:
+        # Step 1: Get the raw structured output from /llm_action
+        raw_output, charts = await route_prompt_deferring_charts(request)
+
+        # Step 2: Fixed-shape results are rendered by template; the rest are refined by the LLM
+        if use_llm_refine(raw_output, request.refine):
+            # The refine prompt never includes chart images, so encoding runs alongside the LLM call
+            refine_prompt = build_refine_prompt(request.prompt, raw_output)
+
+            async def refine():
+                with span("refine_llm"):
+                    return await llm_flight.do(
+                        ("refine", hashlib.sha1(refine_prompt.encode("utf-8")).hexdigest()),
+                        lambda: llm_client.ainvoke(llm, refine_prompt)
+                    )
+            refined, _ = await asyncio.gather(refine(), deliver_charts(charts))
+            refined_message, refined_by = refined.content, "llm"
+        else:
+            # Templates mention the chart, so they are rendered once it is delivered
+            await deliver_charts(charts)
+            with span("refine_template"):
+                refined_message, refined_by = format_response(raw_output), "template"
 
         # Step 3: Return refined response along with original data
-        return JSONResponse(content={
-            "refined_message": refined.content,
+        return JSONResponse(content=with_timings({
+            "refined_message": refined_message,
+            "refined_by": refined_by,
             "raw_output": raw_output
-        })
+        }, request.debug))
 
     except Exception as e:
         logger.error(f"LLM refinement error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to refine response: {str(e)}")
 
+@app.post("/llm_refine/stream")
+async def llm_refine_stream(request: Query):
+    """
+    Streaming variant of /llm_refine over Server-Sent Events: progress events while planning
+    and scraping, then the refined message token by token, then a final "done" event.
+    """
+    return StreamingResponse(
+        stream_refine_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def stream_refine_events(request: Query):
+    async with endpoint_limiter.limit("llm_refine"):
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def emit(event, data):
+            # Called from the event loop or from executor threads
+            loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+        async def produce():
+            token = set_progress_listener(emit)
+            try:
+                raw_output, charts = await route_prompt_deferring_charts(request)
+                if use_llm_refine(raw_output, request.refine):
+                    emit("progress", {"stage": "refining"})
+                    refine_prompt = build_refine_prompt(request.prompt, raw_output)
+                    chart_task = asyncio.ensure_future(deliver_charts(charts))
+                    try:
+                        with span("refine_llm"):
+                            async for chunk in llm_client.astream(llm, refine_prompt):
+                                if chunk.content:
+                                    emit("token", {"text": chunk.content})
+                    finally:
+                        await chart_task
+                    refined_by = "llm"
+                else:
+                    await deliver_charts(charts)
+                    # Templated replies are ready at once, so they go out as a single token event
+                    with span("refine_template"):
+                        emit("token", {"text": format_response(raw_output)})
+                    refined_by = "template"
+                emit("done", with_timings({"raw_output": raw_output, "refined_by": refined_by}, request.debug))
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                logger.error(f"LLM refinement stream error: {detail}")
+                emit("error", {"detail": f"Failed to refine response: {detail}"})
+            finally:
+                reset_progress_listener(token)
+                emit(None, None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                event, data = await queue.get()
+                if event is None:
+                    break
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            if not producer.done():
+                producer.cancel()
+
 @app.post("/llm_action")
 async def llm_action(request: Query):
+    async with endpoint_limiter.limit("llm_action"):
+        return with_timings(await route_prompt(request), request.debug)
+
+async def route_prompt(request: Query):
     try:
         # Use LangChain chain to generate actions
-        actions_data = chain.invoke({"user_prompt": request.prompt})
-        logger.info(f"LangChain LLM response: {json.dumps(actions_data, indent=2)}")
+        actions_data = await get_plan(request.prompt, request.use_plan_cache)
+        report_progress("plan_ready", intents=[key for key in PLAN_ACTION_KEYS if actions_data.get(key)])
 
         actions = actions_data.get("actions", [])
         actions_single = actions_data.get("actions_single", [])
@@ -342,27 +685,32 @@ async def llm_action(request: Query):
 
         if actions_single:
             logger.info("Routing to /single_stock endpoint")
-            return await get_single_stock(request)
+            return await execute_single_stock(actions_single, request.prompt, request.chart)
         elif actions:
             logger.info("Routing to /stocks endpoint")
-            return await get_stocks(request)
+            return await execute_stocks(actions, request.prompt)
         elif actions_chart:
             logger.info("Routing to /stock_chart endpoint")
             chart_action = actions_chart[0]
             ticker = chart_action.get("ticker")
             timeframe = chart_action.get("timeframe", "1Y")
-            return await get_stock_chart(ticker=ticker, timeframe=timeframe)
+            return await execute_stock_chart(ticker=ticker, timeframe=timeframe)
         elif actions_news:
             logger.info("Routing to /stock_news endpoint")
             stock_name = actions_news[0].get("symbol")
             count = actions_news[0].get("count", 5)
             url = actions_news[0].get("url")
-            return await fetch_stock_news(stock=stock_name, url=url, count=count)
+            return await execute_stock_news(stock=stock_name, url=url, count=count)
         elif actions_sector:
             logger.info("Routing to /sector endpoint")
             sector_name = actions_sector[0].get("sector")
             count = actions_sector[0].get("count", 20)
-            return await fetch_sector_data(sector=sector_name, count=count)
+            return await execute_sector_data(
+                sector=sector_name,
+                count=count,
+                sort_by=actions_sector[0].get("sort_by", ""),
+                order=actions_sector[0].get("order", "desc")
+            )
         else:
             logger.warning("No valid actions found in response")
             return {
@@ -378,159 +726,280 @@ async def llm_action(request: Query):
         raise HTTPException(status_code=500, detail=f"Failed to route request: {str(e)}")
 
 @app.post("/stocks")
-async def get_stocks(request: Query):
-    driver = None
-    try:
-        # Use LangChain chain to generate actions
-        actions_data = chain.invoke({"user_prompt": request.prompt})
-        actions = actions_data.get("actions", [])
-        logger.info(f"LangChain LLM response: {json.dumps(actions_data, indent=2)}")
-
-        if not actions:
-            logger.warning("No actions generated by LangChain")
-            generic_response = llm.invoke(request.prompt)
-            return {"message": generic_response.content, "stocks": []}
+async def get_stocks(request: PlanQuery):
+    async with endpoint_limiter.limit("stocks"):
+        actions_data = await resolve_plan(request)
+        response = await execute_stocks(actions_data.get("actions", []), request.prompt)
+        return with_timings(response, request.debug)
+
+async def execute_stocks(actions: list, prompt: str = ""):
+    if not actions:
+        logger.warning("No actions generated by LangChain")
+        if not prompt:
+            return {"message": "No stock actions in plan", "stocks": []}
+        generic_response = await llm_client.ainvoke(llm, prompt)
+        return {"message": generic_response.content, "stocks": []}
+
+    navigate = next((a for a in actions if a.get("action") == "navigate" and a.get("url")), None)
+    extract = next((a for a in actions if a.get("action") == "extract"), None)
+    if not navigate or not extract:
+        logger.warning("Stock plan has no navigate/extract step")
+        return {"message": "No valid stock data found", "stocks": []}
+
+    url = navigate["url"]
+    max_stocks = extract.get("count", 0) or 100
 
-        # Initialize driver
-        driver = get_driver()
-        driver.get("about:blank")  # Test responsiveness
-
-        # Execute actions and collect stock data
-        stocks = []
-        best_stock = None
-        best_change = float('-inf')
-        best_selector = None
-
-        for action in actions:
-            if action["action"] == "navigate":
-                logger.info(f"Navigating to {action['url']}")
-                driver.get(action['url'])
-
-                try:
-                    WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located(
-                            (By.CSS_SELECTOR, "a[class*='tickerNameBox']")
-                        )
-                    )
-                except TimeoutException as e:
-                    logger.error(f"Timeout waiting for ticker elements: {str(e)}")
-                    return {"message": "Failed to load stock data: Timeout", "stocks": []}
-
-            elif action["action"] == "extract":
-                try:
-                    stocks = scrape_stocks(
-                        driver,
-                        row_selector="table tbody tr",
-                        ticker_selector="a[href*='/symbols/']",
-                        price_selector="td:nth-child(3)",
-                        change_percent_selector="td:nth-child(2)",
-                        volume_selector="td:nth-child(4)",
-                        max_stocks=action.get("count", 0) or 100
-                    )
-                    logger.info(f"Scraped {len(stocks)} rows: {stocks}")
-
-                    # Find best performing stock
-                    for stock in stocks:
-                        try:
-                            change_percent = float(stock["change_percent"].strip('%').replace('+', ''))
-                            if change_percent > best_change:
-                                best_change = change_percent
-                                best_stock = stock
-                                best_selector = (
-                                    f"table[class*='portfolio'] tbody tr:nth-child("
-                                    f"{stocks.index(stock) + 1}) td[class*='symbol'] a"
-                                )
-                        except (ValueError, AttributeError) as e:
-                            logger.warning(
-                                f"Failed to parse change_percent for "
-                                f"{stock.get('ticker', 'unknown')}: {str(e)}"
-                            )
-                            continue
-
-                except Exception as e:
-                    logger.error(f"Error in scrape_stocks: {str(e)}")
-                    return {
-                        "message": f"Failed to scrape stock data: {str(e)}",
-                        "stocks": []
-                    }
-
-            elif action["action"] == "click" and best_selector:
-                result = click_element(driver, best_selector)
-                actions.append(result)
-
-        # Prepare response
-        if stocks:
-            formatted_stocks = [
-                {
-                    "Ticker": s["ticker"],
-                    "Price": s["price"],
-                    "Change": s.get("change_percent", "undefined"),
-                    "Volume": s.get("volume", "undefined")
-                }
-                for s in stocks
-            ]
-
-            table_text = "\n".join([
-                f"{s['Ticker']}: Price: {s['Price']}, Change: {s['Change']}, Volume: {s['Volume']}"
-                for s in formatted_stocks
-            ])
-
-            response = {
-                "message": (
-                    f"Top Stocks:\n{table_text}\n\n"
-                    f"Best performing: "
-                    f"{best_stock['ticker'] if best_stock else formatted_stocks[0]['Ticker']} "
-                    f"(+{best_change if best_stock else 'N/A'}%)"
-                ),
-                "stocks": formatted_stocks
-            }
-            logger.info(f"Returning response: {json.dumps(response, indent=2)}")
-            return response
+    try:
+        prefetched = await prefetched_rows(("movers", url, PREFETCH_TABLE_ROWS), max_stocks)
+        if prefetched is not None:
+            stocks, data_age = prefetched
         else:
-            logger.warning("No stocks scraped")
-            return {"message": "No valid stock data found", "stocks": []}
-
+            # Served from the table cache when fresh; stale rows are returned while a refresh runs
+            stocks, data_age = await table_cache.get_or_load(
+                ("movers", url, max_stocks),
+                lambda: scrape_flight.do(("movers", url, max_stocks), lambda: load_mover_rows(url, max_stocks))
+            )
     except TimeoutException as e:
         logger.error(f"Timeout scraping portfolio data: {str(e)}")
-        return {"message": f"Timeout scraping portfolio data: {str(e)}", "stocks": []}
-
-    except NoSuchElementException as e:
-        logger.error(f"Element not found during scraping: {str(e)}")
-        return {"message": f"Element not found during scraping: {str(e)}", "stocks": []}
-
+        return {"message": "Failed to load stock data: Timeout", "stocks": []}
     except Exception as e:
         logger.error(f"Stocks endpoint error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed: {str(e)}")
 
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except Exception as e:
-                logger.warning(f"Failed to quit driver: {str(e)}")
+    report_progress("rows_extracted", rows=len(stocks), data_age_seconds=round(data_age, 1))
+    return build_stocks_response(stocks, data_age)
+
+async def load_mover_rows(url: str, max_stocks: int, browser=run_with_driver):
+    # Server-rendered rows are read over plain HTTP; Selenium only when they are missing.
+    # `browser` runs the fallback: the request pool here, the prefetch pool for refreshes
+    stocks = await http_executor.run(http_engine.scrape_stocks, url, max_stocks=max_stocks)
+    if stocks:
+        report_progress("page_loaded", url=url, engine="http")
+    else:
+        stocks = await browser(fetch_mover_rows, url, max_stocks)
+    record_snapshot(("movers", url, max_stocks), stocks)
+    return stocks
+
+def fetch_mover_rows(url: str, max_stocks: int, driver):
+    logger.info(f"Navigating to {url}")
+    with span("navigation"):
+        driver.get(url)
 
-@app.post("/single_stock")
-async def get_single_stock(request: Query):
-    driver = None
     try:
-        # Use LangChain chain to generate actions
-        actions_data = chain.invoke({"user_prompt": request.prompt})
-        actions = actions_data.get("actions_single", [])
-        logger.info(f"LangChain LLM response: {json.dumps(actions_data, indent=2)}")
-
-        if not actions:
-            logger.warning("No single stock actions generated by LangChain")
-            generic_response = llm.invoke(request.prompt)
-            return {"message": generic_response.content, "stocks": []}
-
-        # Initialize driver
-        driver = get_driver()
-        driver.get("about:blank")  # Test responsiveness
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "a[class*='tickerNameBox']")
+            )
+        )
+    except TimeoutException as e:
+        logger.error(f"Timeout waiting for ticker elements: {str(e)}")
+        raise
+    report_progress("page_loaded", url=url)
+
+    stocks = scrape_stocks(
+        driver,
+        row_selector="table tbody tr",
+        ticker_selector="a[href*='/symbols/']",
+        price_selector="td:nth-child(3)",
+        change_percent_selector="td:nth-child(2)",
+        volume_selector="td:nth-child(4)",
+        max_stocks=max_stocks
+    )
+    logger.info(f"Scraped {len(stocks)} rows: {stocks}")
+    return stocks
+
+def build_stocks_response(stocks: list, data_age: float = 0.0):
+    if not stocks:
+        logger.warning("No stocks scraped")
+        return {"message": "No valid stock data found", "stocks": []}
+
+    # Best performer from the parsed change column; unparsable cells are ignored
+    table = NumericTable(stocks)
+    best = table.extreme("change_percent")
+
+    formatted_stocks = [
+        {
+            "Ticker": s["ticker"],
+            "Price": s["price"],
+            "Change": s.get("change_percent", "undefined"),
+            "Volume": s.get("volume", "undefined")
+        }
+        for s in stocks
+    ]
+
+    table_text = "\n".join([
+        f"{s['Ticker']}: Price: {s['Price']}, Change: {s['Change']}, Volume: {s['Volume']}"
+        for s in formatted_stocks
+    ])
+
+    response = {
+        "message": (
+            f"Top Stocks:\n{table_text}\n\n"
+            f"Best performing: "
+            f"{best[0]['ticker'] if best else formatted_stocks[0]['Ticker']} "
+            f"({f'{best[1]:+.2f}' if best else 'N/A'}%)"
+        ),
+        "stocks": formatted_stocks,
+        "summary": table.summary(MOVER_COLUMNS),
+        "data_age_seconds": round(data_age, 1)
+    }
+    logger.info(f"Returning response: {json.dumps(response, indent=2)}")
+    return response
 
+@app.post("/single_stock")
+async def get_single_stock(request: PlanQuery):
+    async with endpoint_limiter.limit("single_stock"):
+        actions_data = await resolve_plan(request)
+        response = await execute_single_stock(actions_data.get("actions_single", []), request.prompt, request.chart)
+        return with_timings(response, request.debug)
+
+async def execute_single_stock(actions: list, prompt: str = "", chart: ChartOptions | None = None):
+    if not actions:
+        logger.warning("No single stock actions generated by LangChain")
+        if not prompt:
+            return {"message": "No single stock actions in plan", "stocks": []}
+        generic_response = await llm_client.ainvoke(llm, prompt)
+        return {"message": generic_response.content, "stocks": []}
+
+    groups = split_ticker_groups(actions)
+    if len(groups) == 1:
+        return await fetch_ticker_group(groups[0], chart)
+
+    # Comparison: fetch every ticker concurrently on separate pooled sessions
+    if len(groups) > COMPARE_MAX_TICKERS:
+        logger.warning(f"Comparison limited to {COMPARE_MAX_TICKERS} of {len(groups)} tickers")
+        groups = groups[:COMPARE_MAX_TICKERS]
+    fanout = asyncio.Semaphore(COMPARE_FANOUT_LIMIT)
+
+    async def fetch(group):
+        async with fanout:
+            return await fetch_ticker_group(group, chart)
+
+    responses = await asyncio.gather(*(fetch(group) for group in groups), return_exceptions=True)
+    return build_comparison_response(groups, responses)
+
+async def fetch_ticker_group(actions: list, chart: ChartOptions | None = None):
+    # Watchlist tickers are kept warm by the prefetcher
+    ticker = symbol_from_actions(actions)
+    cached = await table_cache.aget(("single", ticker)) if ticker else None
+    if cached is not None:
+        response, data_age = copy.deepcopy(cached[0]), cached[1]
+        response["data_age_seconds"] = round(data_age, 1)
+        report_progress("rows_extracted", rows=len(response.get("stocks", [])), data_age_seconds=round(data_age, 1))
+    else:
+        # Blocking Selenium work runs on the browser executor with a pooled driver
+        response = await scrape_flight.do(
+            ("single", json.dumps(actions, sort_keys=True)),
+            lambda: load_single_stock(actions, ticker),
+            copy_result=True
+        )
+    for stock in response.get("stocks", []):
+        await deliver_or_defer_chart(stock, chart or ChartOptions())
+    return response
+
+# Set while a refine request routes its prompt: chart encoding is collected here and run
+# alongside the refinement LLM call instead of ahead of it
+_deferred_charts: ContextVar = ContextVar("deferred_charts", default=None)
+
+async def deliver_or_defer_chart(stock: dict, options: ChartOptions):
+    deferred = _deferred_charts.get()
+    if deferred is None:
+        await asyncio.to_thread(deliver_chart, stock, options)
+    else:
+        deferred.append((stock, options))
+
+async def route_prompt_deferring_charts(request) -> tuple:
+    """route_prompt, returning (raw_output, charts) with chart delivery left to the caller."""
+    charts = []
+    token = _deferred_charts.set(charts)
+    try:
+        return await route_prompt(request), charts
+    finally:
+        _deferred_charts.reset(token)
+
+async def deliver_charts(charts: list):
+    await asyncio.gather(*(asyncio.to_thread(deliver_chart, stock, options) for stock, options in charts))
+
+async def load_single_stock(actions: list, ticker: str | None):
+    response = await run_with_driver(run_single_stock_actions, actions)
+    if ticker:
+        record_snapshot(("single", ticker), response)
+    return response
+
+def split_ticker_groups(actions: list) -> list[list]:
+    # Each navigate_single starts a ticker; extract steps attach to the preceding navigate
+    groups = []
+    for action in actions:
+        if action.get("action") == "navigate_single" or not groups:
+            groups.append([])
+        groups[-1].append(action)
+    for group in groups:
+        if not any(a.get("action") == "extract_single" for a in group):
+            group.append({"action": "extract_single", "selector": "body", "fields": {}})
+    return groups
+
+def build_comparison_response(groups: list, responses: list):
+    stocks = []
+    failed = []
+    for group, response in zip(groups, responses):
+        ticker = symbol_from_actions(group) or "unknown"
+        if isinstance(response, Exception):
+            logger.error(f"Comparison fetch failed for {ticker}: {str(response)}")
+            failed.append(ticker)
+        elif response.get("stocks"):
+            stocks.extend(response["stocks"])
+        else:
+            failed.append(ticker)
+
+    if not stocks:
+        return {"message": "No stock data found", "stocks": []}
+
+    comparison = {
+        stock["symbol"]: {"price": stock.get("price"), "performance": stock.get("performance", {})}
+        for stock in stocks
+    }
+    lines = [
+        f"{symbol}: Price: {data['price']}, "
+        + ", ".join(f"{label}: {value}" for label, value in data["performance"].items())
+        for symbol, data in comparison.items()
+    ]
+    message = "Stock Comparison:\n" + "\n".join(lines)
+    if failed:
+        message += f"\nCould not fetch: {', '.join(failed)}"
+    return {"message": message, "stocks": stocks, "comparison": comparison}
+
+def symbol_from_actions(actions: list) -> str | None:
+    for action in actions:
+        if action.get("action") == "navigate_single":
+            match = re.search(r"/symbols/([^/]+)/?$", action.get("url", ""))
+            if match:
+                return match.group(1).upper()
+    return None
+
+async def load_watchlist_stock(ticker: str, browser=run_with_driver):
+    # Symbol pages need the browser for the chart capture, so there is no HTTP path here
+    response = await browser(fetch_single_stock, ticker)
+    if response:
+        record_snapshot(("single", ticker), response)
+    return response
+
+def fetch_single_stock(ticker: str, driver):
+    actions = [
+        {"action": "navigate_single", "url": SYMBOL_URL.format(ticker=ticker)},
+        {"action": "extract_single", "selector": "body", "fields": {}},
+    ]
+    response = run_single_stock_actions(actions, driver=driver)
+    return response if response and response.get("stocks") else None
+
+def run_single_stock_actions(actions: list, driver):
+    # The chart canvas is captured on this page, so opt back into images for it
+    set_resource_blocking(driver, allow_images=True)
+    try:
         for action in actions:
             if action["action"] == "navigate_single":
                 logger.info(f"Navigating to {action['url']}")
-                driver.get(action['url'])
+                with span("navigation"):
+                    driver.get(action['url'])
 
                 try:
                     # First check if single-stock header is present
@@ -552,6 +1021,7 @@ async def get_single_stock(request: Query):
                     except TimeoutException as e:
                         logger.error(f"Timeout waiting for page content: {str(e)}")
                         return {"message": "Failed to load stock data: Timeout", "stocks": []}
+                report_progress("page_loaded", url=action['url'])
 
             elif action["action"] == "extract_single":
                 try:
@@ -564,6 +1034,7 @@ async def get_single_stock(request: Query):
                         symbol_selector=symbol_selector,
                         price_selector=price_selector
                     )
+                    report_progress("rows_extracted", rows=1 if stock else 0)
 
                     if stock and stock.get("symbol") and stock.get("price"):
                         response = {
@@ -577,7 +1048,7 @@ async def get_single_stock(request: Query):
                             ),
                             "stocks": [stock],
                         }
-                        logger.info(f"Returning single stock response: {json.dumps(response, indent=2)}")
+                        logger.info(f"Returning single stock response for {stock['symbol']} at {stock['price']}")
                         return response
                     else:
                         return {"message": "No stock data found", "stocks": []}
@@ -599,24 +1070,27 @@ async def get_single_stock(request: Query):
         raise HTTPException(status_code=500, detail=f"Failed: {str(e)}")
 
     finally:
-        if driver:
-            try:
-                driver.quit()
-            except Exception as e:
-                logger.warning(f"Failed to quit driver: {str(e)}")
+        set_resource_blocking(driver)
 
 @app.get("/stock_news")
-async def fetch_stock_news(stock: str, url, count: int = 5, days_limit: int = 7):
+async def fetch_stock_news(stock: str, url, count: int = 5, days_limit: int = 7, debug: bool = False):
+    async with endpoint_limiter.limit("stock_news"):
+        return with_timings(await execute_stock_news(stock, url, count, days_limit), debug)
+
+async def execute_stock_news(stock: str, url, count: int = 5, days_limit: int = 7):
     try:
         # Call scraping function
-        driver = get_driver()
-        news_list = scrape_stock_news(
-            driver=driver,
-            url=url,
-            stock_ticker=stock,
-            max_news=count,
-            days_limit=days_limit
+        news_list = await scrape_flight.do(
+            ("news", url, count, days_limit),
+            lambda: run_with_driver(
+                scrape_stock_news,
+                url=url,
+                stock_ticker=stock,
+                max_news=count,
+                days_limit=days_limit
+            )
         )
+        report_progress("rows_extracted", rows=len(news_list))
 
         if not news_list:
             return {
@@ -647,25 +1121,122 @@ async def fetch_stock_news(stock: str, url, count: int = 5, days_limit: int = 7)
         }
 
 @app.get("/sector_data")
-async def fetch_sector_data(sector: str, count: int = 20):
+async def fetch_sector_data(sector: str, count: int = 20, sort_by: str = "", order: str = "desc",
+                            debug: bool = False):
+    async with endpoint_limiter.limit("sector_data"):
+        return with_timings(await execute_sector_data(sector, count, sort_by, order), debug)
+
+HISTORY_DISABLED_MESSAGE = "Price history is disabled (SNAPSHOT_ENABLED=false or the snapshot store could not be opened)"
+
+@app.get("/history/{ticker}")
+async def get_ticker_history(ticker: str, since: str | None = None, hours: float = 24, limit: int = 500):
+    # Answered from local snapshots; nothing is scraped
     try:
-        driver = get_driver()
-        try:
-            all_data = scrape_sector(sector, driver=driver, count=count)
-            if not all_data or not any("Symbol" in record for record in all_data):
-                logger.warning(f"Invalid or empty data for sector '{sector}': {all_data[:2]}")
+        start = since_timestamp(since, hours)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid 'since' value: {since}")
+    if not snapshot_store.ready:
+        return {"ticker": ticker.upper(), "message": HISTORY_DISABLED_MESSAGE, "points": []}
+    try:
+        points = await asyncio.to_thread(snapshot_store.ticker_history, ticker, start, None, limit)
+    except sqlite3.Error as e:
+        logger.error(f"History read for {ticker} failed: {str(e)}")
+        return {"ticker": ticker.upper(), "message": "Price history is unavailable right now", "points": [],
+                "error": str(e)}
+    priced = [p for p in points if p["price"] is not None]
+    if len(priced) < 2:
+        return {"ticker": ticker.upper(), "message": f"Not enough snapshots of {ticker.upper()} in this window",
+                "points": points}
+    first, last = priced[0]["price"], priced[-1]["price"]
+    change = {
+        "from_price": first,
+        "to_price": last,
+        "change": round(last - first, 4),
+        "change_percent": round((last - first) * 100 / first, 4) if first else None,
+    }
+    # A zero first price has no percentage change
+    percent = f" ({change['change_percent']:+.2f}%)" if change["change_percent"] is not None else ""
+    message = f"{ticker.upper()} moved {change['change']:+.2f}{percent} over {len(priced)} snapshots"
+    return {"ticker": ticker.upper(), "message": message, "change": change, "points": points}
+
+@app.get("/history_movers")
+async def get_history_movers(sector: str = "", since: str | None = "today", hours: float = 24, k: int = 10,
+                             order: str = "desc"):
+    # "Which tech stocks climbed most today": rank by first-to-last snapshot price in the window
+    try:
+        start = since_timestamp(since, hours)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid 'since' value: {since}")
+    if not snapshot_store.ready:
+        return {"message": HISTORY_DISABLED_MESSAGE, "data": []}
+    source = f"sector:{sector.lower()}" if sector else ""
+    try:
+        movers = await asyncio.to_thread(snapshot_store.movers, start, source, k, "asc" if order == "asc" else "desc")
+    except sqlite3.Error as e:
+        logger.error(f"History movers read failed: {str(e)}")
+        return {"message": "Price history is unavailable right now", "data": [], "error": str(e)}
+    scope = f"{sector} stocks" if sector else "stocks"
+    if not movers:
+        return {"message": f"No snapshot history for {scope} in this window", "data": []}
+    label = "Fell most" if order == "asc" else "Climbed most"
+    return {"message": f"{label} among {scope}: {len(movers)} results", "data": movers}
+
+def sector_fetch_count(count: int | str, sort_by: str = "") -> int | str:
+    # Ranked queries ("worst 5") need a wider slice than they return; rank over the prefetched size
+    if not sort_by or str(count).lower() == "all":
+        return count
+    try:
+        return max(int(count), PREFETCH_TABLE_ROWS)
+    except (TypeError, ValueError):
+        return count
+
+async def execute_sector_data(sector: str, count: int | str = 20, sort_by: str = "", order: str = "desc"):
+    try:
+        fetch_count = sector_fetch_count(count, sort_by)
+        prefetched = await prefetched_rows(("sector", sector.lower(), str(PREFETCH_TABLE_ROWS)), fetch_count)
+        if prefetched is not None:
+            all_data, data_age = prefetched
+        else:
+            all_data, data_age = await table_cache.get_or_load(
+                ("sector", sector.lower(), str(fetch_count).lower()),
+                lambda: scrape_flight.do(
+                    ("sector", sector.lower(), str(fetch_count).lower()),
+                    lambda: load_sector_rows(sector, fetch_count)
+                )
+            )
+        # Summaries cover every loaded row, not just the ranked slice that is returned
+        summary = sector_summary(all_data) if all_data else {}
+        if sort_by and all_data:
+            column = resolve_column(all_data, sort_by)
+            if column is None:
+                # Unknown or non-numeric column: say so instead of returning unranked rows
+                valid = ", ".join(numeric_columns(all_data))
+                logger.warning(f"Cannot rank sector '{sector}' by '{sort_by}'")
                 return {
                     "actions": [],
-                    "message": f"No valid stock data found for sector '{sector}'",
-                    "data": []
+                    "message": f"Cannot rank {sector} stocks by '{sort_by}'. Numeric columns: {valid}",
+                    "data": [],
+                    "error": f"Unknown sort column '{sort_by}'"
                 }
+            sort_by = column
+            limit = None if str(count).lower() == "all" else int(count)
+            all_data = rank_rows(all_data, sort_by, order.lower(), limit)
+        report_progress("rows_extracted", rows=len(all_data), data_age_seconds=round(data_age, 1))
+        if not all_data or not any("Symbol" in record for record in all_data):
+            logger.warning(f"Invalid or empty data for sector '{sector}': {all_data[:2]}")
             return {
                 "actions": [],
-                "message": f"Found {len(all_data)} stocks in {sector} sector",
-                "data": all_data
+                "message": f"No valid stock data found for sector '{sector}'",
+                "data": []
             }
-        finally:
-            driver.quit()
+        ranking = f", ranked by {sort_by} ({'lowest' if order.lower() == 'asc' else 'highest'} first)" if sort_by else ""
+        return {
+            "actions": [],
+            "message": f"Found {len(all_data)} stocks in {sector} sector{ranking}",
+            "data": all_data,
+            "summary": summary,
+            "data_age_seconds": round(data_age, 1)
+        }
     except Exception as e:
         logger.error(f"Error fetching sector '{sector}': {e}")
         return {
@@ -675,10 +1246,24 @@ async def fetch_sector_data(sector: str, count: int = 20):
             "error": str(e)
         }
 
+async def load_sector_rows(sector: str, count: int | str, browser=run_with_driver):
+    all_data = await http_executor.run(http_engine.scrape_sector, sector, count)
+    if all_data:
+        report_progress("page_loaded", url=sector_url(sector), engine="http")
+    else:
+        all_data = await browser(scrape_sector, sector, count=count)
+    record_snapshot(("sector", sector.lower(), str(count)), all_data)
+    return all_data
+
 @app.get("/stock_chart")
 async def get_stock_chart(ticker: str, timeframe: str = "12M"):
+    async with endpoint_limiter.limit("stock_chart"):
+        return await execute_stock_chart(ticker, timeframe)
+
+async def execute_stock_chart(ticker: str, timeframe: str = "12M"):
     try:
-        result = display_stock_chart(ticker, timeframe, headless=False)
+        # Opens its own visible browser, so it bypasses the driver pool
+        result = await browser_executor.run(display_stock_chart, ticker, timeframe, headless=False)
         return {
             "message": result["message"],
             "status": result["status"]
@@ -0,0 +1,91 @@
+import copy
+import time
+import asyncio
+from types import SimpleNamespace
+
+
+def canned_plans(base_url: str) -> dict[str, dict]:
+    """Plans the real planner would return for the benchmark prompts, pointed at the fixture server."""
+    def plan(**actions):
+        full = {key: [] for key in ("actions", "actions_single", "actions_news", "action_sector", "actions_chart")}
+        full.update(actions)
+        full["message"] = ""
+        return full
+
+    return {
+        "Show me top 10 gainers": plan(actions=[
+            {"action": "navigate", "url": f"{base_url}/markets/stocks-usa/market-movers-gainers/"},
+            {"action": "extract", "selector": "table[class*='market-table'] tbody tr", "count": 10},
+        ]),
+        "Show me top 10 losers": plan(actions=[
+            {"action": "navigate", "url": f"{base_url}/markets/stocks-usa/market-movers-losers/"},
+            {"action": "extract", "selector": "table[class*='market-table'] tbody tr", "count": 10},
+        ]),
+        "What is the price of Apple?": plan(actions_single=[
+            {"action": "navigate_single", "url": f"{base_url}/symbols/AAPL/"},
+            {"action": "extract_single", "selector": "body", "fields": {
+                "symbol": "h1.apply-overflow-tooltip",
+                "price": "span.js-symbol-last",
+                "performance": "span.content-o1CQs_Mg",
+            }},
+        ]),
+        "Latest 5 news on Tesla": plan(actions_news=[
+            {"action": "fetch_stock_news", "url": f"{base_url}/symbols/TSLA/news/", "symbol": "TSLA", "count": 5},
+        ]),
+        "Show 20 stocks in Technology services": plan(action_sector=[
+            {"action": "fetch_sector_data", "sector": "Technology services", "count": 20},
+        ]),
+    }
+
+
+class FakeChain:
+    """Stands in for `prompt_template | llm | parser`: returns the canned plan for each prompt."""
+
+    def __init__(self, plans: dict[str, dict], latency: float = 0.0):
+        self.plans = plans
+        self.latency = latency
+        self.calls = 0
+
+    def _plan(self, inputs: dict) -> dict:
+        self.calls += 1
+        prompt = inputs["user_prompt"]
+        return copy.deepcopy(self.plans.get(prompt, {"message": f"No canned plan for '{prompt}'"}))
+
+    def invoke(self, inputs: dict, *args, **kwargs) -> dict:
+        time.sleep(self.latency)
+        return self._plan(inputs)
+
+    async def ainvoke(self, inputs: dict, *args, **kwargs) -> dict:
+        await asyncio.sleep(self.latency)
+        return self._plan(inputs)
+
+
+class FakeLLM:
+    """Stands in for the chat model used for refinement; replies with a fixed message."""
+
+    REPLY = (
+        "**Stock Info:**\n- Benchmark data summarised from fixture pages.\n\n"
+        "**Performance History:**\n- 1W: +2.31%, 1M: +5.87%, 1Y: +24.66%\n"
+    )
+
+    def __init__(self, latency: float = 0.0, chunk_size: int = 16):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    def invoke(self, prompt, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(content=self.REPLY)
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=self.REPLY)
+
+    async def astream(self, prompt, *args, **kwargs):
+        self.calls += 1
+        chunks = [self.REPLY[i:i + self.chunk_size] for i in range(0, len(self.REPLY), self.chunk_size)]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield SimpleNamespace(content=chunk)
@@ -0,0 +1,78 @@
+import re
+import datetime
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# URL paths mirror TradingView's so the app's selectors and URL templates apply unchanged
+ROUTES = [
+    (re.compile(r"^/markets/stocks-usa/market-movers-gainers/?$"), "gainers.html"),
+    (re.compile(r"^/markets/stocks-usa/market-movers-losers/?$"), "losers.html"),
+    (re.compile(r"^/markets/stocks-usa/sectorandindustry-sector/[\w-]+/?$"), "sector.html"),
+    (re.compile(r"^/symbols/(?P<ticker>[\w.-]+)/news/?$"), "news.html"),
+    (re.compile(r"^/symbols/(?P<ticker>[\w.-]+)/?$"), "symbol.html"),
+]
+
+
+def render(name: str, ticker: str | None) -> bytes:
+    html = (FIXTURES_DIR / name).read_text(encoding="utf-8")
+    if ticker:
+        html = html.replace("{ticker}", ticker.split("-")[-1].upper())
+    # News dates are relative to today so the scraper's days_limit filter keeps them
+    today = datetime.date.today()
+    for i in range(4):
+        html = html.replace(f"{{date_{i}}}", (today - datetime.timedelta(days=i)).strftime("%b %d, %Y"))
+    return html.encode("utf-8")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        for pattern, name in ROUTES:
+            match = pattern.match(path)
+            if match:
+                body = render(name, match.groupdict().get("ticker"))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves bench/fixtures on a local port in a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    server = FixtureServer(port=8765).start()
+    print(f"Serving fixtures at {server.base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,228 @@
+"""
+Offline end-to-end benchmark: serves saved TradingView pages locally, swaps the Gemini
+chain/model for canned fakes, and drives the FastAPI app over real HTTP.
+
+    python bench/run_bench.py --requests 50 --concurrency 4 --out results.json
+    python bench/run_bench.py --compare results.json
+
+/stocks, /sector_data and the /llm_refine scenario are served by the HTTP engine and need no
+browser; /single_stock and /stock_news drive Chrome, so CHROMEDRIVER_PATH must point at a
+chromedriver matching the installed Chrome.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import tempfile
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import FixtureServer
+from fake_llm import FakeChain, FakeLLM, canned_plans
+
+ENDPOINTS = ["llm_refine", "stocks", "single_stock", "stock_news", "sector_data"]
+# Result lists an endpoint returns; an empty one means the scrape found nothing
+RESULT_KEYS = ("stocks", "data", "news")
+
+
+def scenarios(base_url: str) -> dict[str, tuple[str, str, dict | None]]:
+    """endpoint name -> (method, path, json body)"""
+    news_query = urllib.parse.urlencode({"stock": "TSLA", "url": f"{base_url}/symbols/TSLA/news/", "count": 5})
+    sector_query = urllib.parse.urlencode({"sector": "Technology services", "count": 20})
+    return {
+        "llm_refine": ("POST", "/llm_refine", {"prompt": "Show me top 10 gainers"}),
+        "stocks": ("POST", "/stocks", {"prompt": "Show me top 10 losers"}),
+        "single_stock": ("POST", "/single_stock", {"prompt": "What is the price of Apple?"}),
+        "stock_news": ("GET", f"/stock_news?{news_query}", None),
+        "sector_data": ("GET", f"/sector_data?{sector_query}", None),
+    }
+
+
+def configure_environment(fixture_url: str, warm: bool):
+    # Must run before `app` is imported: these are read at import time
+    os.environ.setdefault("GOOGLE_GEMINI_KEY", "bench")
+    os.environ["SECTOR_URL_TEMPLATE"] = f"{fixture_url}/markets/stocks-usa/sectorandindustry-sector/{{slug}}/"
+    os.environ["PREFETCH_ENABLED"] = "false"
+    # Keep the snapshot writer thread out of the timings and snapshots.db out of the working tree
+    os.environ["SNAPSHOT_ENABLED"] = "false"
+    os.environ.setdefault("SNAPSHOT_DB_PATH", os.path.join(tempfile.gettempdir(), "bench-snapshots.db"))
+    # The router would plan real TradingView URLs; every plan comes from the fake chain instead
+    os.environ["FAST_ROUTER_ENABLED"] = "false"
+    os.environ.setdefault("DRIVER_POOL_MIN", "0")
+    if not warm:
+        os.environ["PLAN_CACHE_ENABLED"] = "false"
+        os.environ["TABLE_CACHE_TTL"] = "0"
+        os.environ["TABLE_CACHE_STALE_TTL"] = "0"
+
+
+def start_app(port: int, llm_latency: float, fixture_url: str):
+    import uvicorn
+    import app as app_module
+
+    # Per-request INFO logs from the app would dominate both the output and the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    app_module.chain = FakeChain(canned_plans(fixture_url), latency=llm_latency)
+    app_module.llm = FakeLLM(latency=llm_latency)
+
+    config = uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="bench-app", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 60
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("App server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def succeeded(payload) -> bool:
+    """
+    The app reports scrape, LLM and browser failures as 200 responses with an `error` key or
+    an empty result list, so those count as errors too. /llm_refine nests its result in raw_output.
+    """
+    if not isinstance(payload, dict):
+        return False
+    if "error" in payload:
+        return False
+    if any(key in payload and not payload[key] for key in RESULT_KEYS):
+        return False
+    return succeeded(payload["raw_output"]) if "raw_output" in payload else True
+
+
+def call(base: str, method: str, path: str, body: dict | None, timeout: float) -> tuple[float, bool]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            ok = response.status == 200 and succeeded(json.loads(response.read()))
+    except (urllib.error.URLError, TimeoutError, ConnectionError, ValueError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    # Nearest-rank, so small runs report an observed latency rather than an interpolation
+    rank = max(1, round(pct / 100 * len(sorted_values) + 0.5))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_endpoint(base: str, scenario: tuple, requests: int, concurrency: int, warmup: int, timeout: float) -> dict:
+    method, path, body = scenario
+    for _ in range(warmup):
+        call(base, method, path, body, timeout)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: call(base, method, path, body, timeout), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, ok in results if ok)
+    ms = lambda value: round(value * 1000, 1) if value is not None else None
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: dict, baseline: dict | None = None):
+    columns = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+    print(f"{'endpoint':<14}{'errors':>8}" + "".join(f"{c:>18}" for c in columns))
+    for name, row in results["endpoints"].items():
+        line = f"{name:<14}{row['errors']:>6}/{row['requests']:<3}"
+        base_row = (baseline or {}).get("endpoints", {}).get(name)
+        for column in columns:
+            value = row[column]
+            cell = "-" if value is None else f"{value}"
+            if base_row and value is not None and base_row.get(column):
+                change = (value - base_row[column]) / base_row[column] * 100
+                cell += f" ({change:+.0f}%)"
+            line += f"{cell:>18}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark for the stock assistant API")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of " + ", ".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=50, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured requests per endpoint")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per fake LLM call")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--warm", action="store_true", help="keep plan/table caches enabled")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline results JSON to diff against")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(selected) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    fixtures = FixtureServer().start()
+    configure_environment(fixtures.base_url, args.warm)
+    server, thread = start_app(args.port, args.llm_latency, fixtures.base_url)
+    base = f"http://127.0.0.1:{args.port}"
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup,
+            "llm_latency": args.llm_latency, "warm": args.warm,
+        },
+        "endpoints": {},
+    }
+    try:
+        all_scenarios = scenarios(fixtures.base_url)
+        for name in selected:
+            results["endpoints"][name] = run_endpoint(
+                base, all_scenarios[name], args.requests, args.concurrency, args.warmup, args.timeout
+            )
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+        fixtures.stop()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print(f"Comparing {results['revision']} against {baseline.get('revision')}")
+    print_results(results, baseline)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from cache_backend import make_backend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TABLE_CACHE_TTL = float(os.getenv("TABLE_CACHE_TTL", "30"))
+TABLE_CACHE_STALE_TTL = float(os.getenv("TABLE_CACHE_STALE_TTL", "300"))
+TABLE_CACHE_MAX_ENTRIES = int(os.getenv("TABLE_CACHE_MAX_ENTRIES", "256"))
+TABLE_CACHE_MAX_BYTES = int(os.getenv("TABLE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# With a shared backend, a worker that finds another worker loading the same key waits this
+# long for its result before loading it itself
+CACHE_LOAD_LOCK_TTL = float(os.getenv("CACHE_LOAD_LOCK_TTL", "30"))
+CACHE_LOAD_WAIT = float(os.getenv("CACHE_LOAD_WAIT", "15"))
+CACHE_LOAD_POLL = 0.1
+
+
+class TTLCache:
+    """
+    Cache bounded by entry count and approximate bytes. Entries are fresh for `ttl`
+    seconds and may be served stale for `stale_ttl` more while a background refresh runs.
+    Storage is a backend from cache_backend: in-process by default, or shared across workers.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0.0,
+                 max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend = backend or make_backend(name, max_entries, max_bytes)
+        self._refreshing: dict = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.shared_waits = 0
+
+    # --- Storage ---
+    def get(self, key):
+        """Return (value, age_seconds) for a fresh or stale entry, else None."""
+        cached = self.backend.get(key)
+        if cached is None:
+            return None
+        value, stored_at = cached
+        age = time.time() - stored_at
+        if age > self.ttl + self.stale_ttl:
+            self.backend.delete(key)
+            return None
+        return value, age
+
+    def set(self, key, value, stored_at: float | None = None):
+        self.backend.set(key, value, stored_at or time.time(), self.ttl + self.stale_ttl)
+
+    def claim(self, key, ttl: float) -> str | None:
+        """
+        Atomically take `key` for `ttl` seconds unless another worker holds it. Returns a token
+        for `release`, or None if the key is taken. Always succeeds for the in-process backend,
+        where there is no other worker to defer to.
+        """
+        token = uuid.uuid4().hex
+        if not self.backend.shared:
+            return token
+        return token if self.backend.add(("claim", key), token, ttl) else None
+
+    def release(self, key, token: str):
+        # Only the holder's token matches, so an expired claim retaken by a peer stays put
+        if self.backend.shared:
+            self.backend.delete_if(("claim", key), token)
+
+    # --- Async access ---
+    async def run_io(self, fn, *args):
+        """
+        Await `fn(*args)` from a coroutine. Shared backends do file or network I/O (with busy
+        and socket timeouts), so it runs on a worker thread; the in-process backend runs inline.
+        """
+        if self.backend.shared:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def aget(self, key):
+        return await self.run_io(self.get, key)
+
+    async def aset(self, key, value, stored_at: float | None = None):
+        await self.run_io(self.set, key, value, stored_at)
+
+    async def aclaim(self, key, ttl: float) -> str | None:
+        return await self.run_io(self.claim, key, ttl)
+
+    async def arelease(self, key, token: str):
+        await self.run_io(self.release, key, token)
+
+    # --- Stale-while-revalidate ---
+    async def get_or_load(self, key, loader):
+        """
+        Return (value, age_seconds). `loader` is an async callable; empty results are not cached.
+        Stale entries are returned immediately and refreshed in the background.
+        """
+        cached = await self.aget(key)
+        if cached is not None:
+            value, age = cached
+            if age <= self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                await self._schedule_refresh(key, loader)
+            return value, age
+
+        self.misses += 1
+        token = await self.aclaim(("load", key), CACHE_LOAD_LOCK_TTL)
+        if token is None:
+            # Another worker is loading this key; reuse its result when it lands
+            cached, token = await self._wait_for_peer(key)
+            if cached is not None:
+                return cached
+        try:
+            value = await loader()
+            if value:
+                await self.aset(key, value)
+        finally:
+            # After a timed-out wait the peer still holds the claim; leave it alone
+            if token is not None:
+                await self.arelease(("load", key), token)
+        return value, 0.0
+
+    async def _wait_for_peer(self, key):
+        """Return (cached, None) once the peer's result lands, or (None, token) to load here."""
+        self.shared_waits += 1
+        deadline = time.monotonic() + CACHE_LOAD_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(CACHE_LOAD_POLL)
+            cached = await self.aget(key)
+            if cached is not None:
+                return cached, None
+            token = await self.aclaim(("load", key), CACHE_LOAD_LOCK_TTL)
+            if token is not None:
+                # The other worker gave up (or its load came back empty); load it here
+                return None, token
+        logger.warning(f"{self.name} cache: gave up waiting for another worker to load {key}")
+        return None, None
+
+    async def _schedule_refresh(self, key, loader):
+        if key in self._refreshing:
+            return
+        # Reserve the slot before awaiting the claim so concurrent stale hits don't both refresh
+        self._refreshing[key] = None
+        # One worker refreshes; the others keep serving the stale entry
+        token = await self.aclaim(("load", key), CACHE_LOAD_LOCK_TTL)
+        if token is None:
+            self._refreshing.pop(key, None)
+            return
+
+        async def refresh():
+            try:
+                value = await loader()
+                if value:
+                    await self.aset(key, value)
+            except Exception as e:
+                logger.warning(f"{self.name} cache: background refresh for {key} failed: {str(e)}")
+            finally:
+                self._refreshing.pop(key, None)
+                await self.arelease(("load", key), token)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> dict:
+        backend = self.backend.stats()
+        return {
+            "backend": backend["backend"],
+            "entries": backend["entries"],
+            "bytes": backend["bytes"],
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": backend["evictions"],
+            "refreshing": len(self._refreshing),
+            "shared_waits": self.shared_waits,
+            "backend_errors": backend.get("errors", 0),
+        }
+
+
+# Market-mover and sector tables, keyed by ("movers", url, count) / ("sector", sector, count)
+table_cache = TTLCache(
+    "table",
+    ttl=TABLE_CACHE_TTL,
+    stale_ttl=TABLE_CACHE_STALE_TTL,
+    max_entries=TABLE_CACHE_MAX_ENTRIES,
+    max_bytes=TABLE_CACHE_MAX_BYTES,
+)
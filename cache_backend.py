@@ -0,0 +1,412 @@
+import os
+import json
+import time
+import zlib
+import struct
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # redis is optional; only needed for CACHE_BACKEND=redis
+    redis = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "memory" keeps entries in this process; "sqlite" and "redis" share them across uvicorn workers
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "cache.db")
+# Any Redis-protocol server works (Redis, Valkey, KeyDB, a local stand-in)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "eyeonstox:")
+# Serialized values at least this large are zlib-compressed
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+CACHE_SQLITE_PRUNE_EVERY = 200
+
+_RAW, _ZLIB = b"j", b"z"
+_STORED_AT = struct.Struct("!d")
+
+
+def estimate_size(value) -> int:
+    try:
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+def key_string(key) -> str:
+    # Tuple keys like ("movers", url, 20) become '["movers","https://...",20]'
+    return key if isinstance(key, str) else json.dumps(key, separators=(",", ":"), default=str)
+
+
+def dumps(value) -> bytes:
+    """Compact JSON, zlib-compressed when large; the first byte records which."""
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) >= CACHE_COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(raw, 6)
+    return _RAW + raw
+
+
+def loads(blob: bytes):
+    tag, body = blob[:1], blob[1:]
+    if tag == _ZLIB:
+        body = zlib.decompress(body)
+    return json.loads(body)
+
+
+class MemoryEntry:
+    __slots__ = ("value", "stored_at", "expires_at", "size")
+
+    def __init__(self, value, stored_at: float, expires_at: float, size: int):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.size = size
+
+
+class MemoryBackend:
+    """Per-process LRU bounded by entry count and approximate bytes; values are not copied."""
+
+    shared = False
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (value, stored_at) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry.value, entry.stored_at
+
+    def set(self, key, value, stored_at: float, ttl: float):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"{self.name} cache: value for {key} too large to cache ({size} bytes)")
+            return
+        with self._lock:
+            self._put(key, MemoryEntry(value, stored_at, stored_at + ttl, size))
+
+    def add(self, key, value, ttl: float) -> bool:
+        """Store only if no live entry exists; True if this call stored it."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                return False
+            self._put(key, MemoryEntry(value, now, now + ttl, estimate_size(value)))
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_if(self, key, value):
+        """Delete `key` only while it still holds `value`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value == value:
+                self._remove(key)
+
+    def _put(self, key, entry: MemoryEntry):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "bytes": self._bytes,
+                    "evictions": self.evictions}
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (namespace, expires_at);
+"""
+
+
+class SQLiteBackend:
+    """
+    Entries in a local SQLite file shared by every worker on the host. Each statement is
+    atomic, so `add` doubles as a cross-process lock. `max_entries` and `max_bytes` (stored,
+    compressed bytes) are enforced by periodic pruning, so the file can briefly run over.
+    """
+
+    shared = True
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, path: str = CACHE_SQLITE_PATH):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._bytes_since_prune = 0
+        self.evictions = 0
+        self.errors = 0
+        with self._conn() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads; executors call in from workers
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _failed(self, action: str, e: Exception):
+        self.errors += 1
+        logger.warning(f"{self.name} cache: sqlite {action} failed: {str(e)}")
+
+    def get(self, key):
+        try:
+            row = self._conn().execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.name, key_string(key), time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed("get", e)
+            return None
+        return (loads(row[0]), row[1]) if row else None
+
+    def set(self, key, value, stored_at: float, ttl: float):
+        blob = dumps(value)
+        if len(blob) > self.max_bytes:
+            logger.warning(f"{self.name} cache: value for {key} too large to cache ({len(blob)} bytes)")
+            return
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (self.name, key_string(key), blob, stored_at, stored_at + ttl)
+            )
+        except sqlite3.Error as e:
+            self._failed("set", e)
+            return
+        self._after_write(len(blob))
+
+    def add(self, key, value, ttl: float) -> bool:
+        now = time.time()
+        blob = dumps(value)
+        try:
+            # Inserts, or replaces an expired row; a live row leaves rowcount at 0
+            cursor = self._conn().execute(
+                "INSERT INTO cache VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+                "stored_at = excluded.stored_at, expires_at = excluded.expires_at "
+                "WHERE cache.expires_at <= ?",
+                (self.name, key_string(key), blob, now, now + ttl, now)
+            )
+        except sqlite3.Error as e:
+            # Without the shared store, proceed as if this worker were alone
+            self._failed("add", e)
+            return True
+        self._after_write(len(blob))
+        return cursor.rowcount > 0
+
+    def delete(self, key):
+        try:
+            self._conn().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, key_string(key)))
+        except sqlite3.Error as e:
+            self._failed("delete", e)
+
+    def delete_if(self, key, value):
+        # Values are serialized deterministically, so the stored blob compares equal
+        try:
+            self._conn().execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ? AND value = ?",
+                (self.name, key_string(key), dumps(value))
+            )
+        except sqlite3.Error as e:
+            self._failed("delete", e)
+
+    def _after_write(self, size: int):
+        self._writes += 1
+        self._bytes_since_prune += size
+        # Prune every few hundred writes, or sooner when large values arrive
+        if self._writes % CACHE_SQLITE_PRUNE_EVERY and self._bytes_since_prune < self.max_bytes // 8:
+            return
+        self._bytes_since_prune = 0
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at <= ?", (self.name, time.time()))
+            # Oldest entries beyond max_entries go, as in the in-process LRU
+            evicted = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache WHERE namespace = ? ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.name, self.name, self.max_entries)
+            ).rowcount
+            self.evictions += max(evicted, 0)
+            self._trim_bytes(conn)
+        except sqlite3.Error as e:
+            self._failed("prune", e)
+
+    def _trim_bytes(self, conn: sqlite3.Connection):
+        (size,) = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM cache WHERE namespace = ?", (self.name,)
+        ).fetchone()
+        excess = size - self.max_bytes
+        if excess <= 0:
+            return
+        # Oldest first, until the namespace fits in max_bytes again
+        doomed = []
+        for key, length in conn.execute(
+            "SELECT key, LENGTH(value) FROM cache WHERE namespace = ? ORDER BY stored_at", (self.name,)
+        ):
+            if excess <= 0:
+                break
+            doomed.append((self.name, key))
+            excess -= length
+        conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self) -> dict:
+        try:
+            entries, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache WHERE namespace = ? AND expires_at > ?",
+                (self.name, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed("stats", e)
+            entries, size = None, None
+        return {"backend": "sqlite", "path": self.path, "entries": entries, "bytes": size,
+                "evictions": self.evictions, "errors": self.errors}
+
+
+_redis_clients: dict = {}
+
+
+# DEL only while the key still holds the caller's payload (after the store-time header)
+_REDIS_DELETE_IF = """
+local blob = redis.call('GET', KEYS[1])
+if blob and string.sub(blob, ARGV[2] + 1) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackend:
+    """
+    Entries in a Redis-protocol server shared by every worker. Expiry is left to the server
+    (PX); `add` is SET NX. Values carry their store time ahead of the serialized payload.
+    Size limits apply per value; the server's own maxmemory policy bounds the total.
+    """
+
+    shared = True
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, url: str = CACHE_REDIS_URL):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.url = url
+        self.errors = 0
+        # One connection pool per server, shared by every cache namespace
+        if url not in _redis_clients:
+            _redis_clients[url] = redis.Redis.from_url(
+                url, socket_timeout=CACHE_REDIS_TIMEOUT, socket_connect_timeout=CACHE_REDIS_TIMEOUT
+            )
+        self._client = _redis_clients[url]
+
+    def _key(self, key) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.name}:{key_string(key)}"
+
+    def _failed(self, action: str, e: Exception):
+        self.errors += 1
+        logger.warning(f"{self.name} cache: redis {action} failed: {str(e)}")
+
+    @staticmethod
+    def _ttl_ms(ttl: float) -> int:
+        return max(int(ttl * 1000), 1)
+
+    def get(self, key):
+        try:
+            blob = self._client.get(self._key(key))
+        except redis.RedisError as e:
+            self._failed("get", e)
+            return None
+        if blob is None:
+            return None
+        (stored_at,) = _STORED_AT.unpack_from(blob)
+        return loads(blob[_STORED_AT.size:]), stored_at
+
+    def set(self, key, value, stored_at: float, ttl: float):
+        blob = _STORED_AT.pack(stored_at) + dumps(value)
+        if len(blob) > self.max_bytes:
+            logger.warning(f"{self.name} cache: value for {key} too large to cache ({len(blob)} bytes)")
+            return
+        try:
+            self._client.set(self._key(key), blob, px=self._ttl_ms(ttl))
+        except redis.RedisError as e:
+            self._failed("set", e)
+
+    def add(self, key, value, ttl: float) -> bool:
+        blob = _STORED_AT.pack(time.time()) + dumps(value)
+        try:
+            return bool(self._client.set(self._key(key), blob, px=self._ttl_ms(ttl), nx=True))
+        except redis.RedisError as e:
+            self._failed("add", e)
+            return True
+
+    def delete(self, key):
+        try:
+            self._client.delete(self._key(key))
+        except redis.RedisError as e:
+            self._failed("delete", e)
+
+    def delete_if(self, key, value):
+        try:
+            self._client.eval(_REDIS_DELETE_IF, 1, self._key(key), dumps(value), _STORED_AT.size)
+        except redis.RedisError as e:
+            self._failed("delete", e)
+
+    def stats(self) -> dict:
+        # Entry counts would need a keyspace scan; the server's INFO covers memory and keys
+        return {"backend": "redis", "entries": None, "bytes": None, "evictions": None, "errors": self.errors}
+
+
+BACKENDS = {"memory": MemoryBackend, "sqlite": SQLiteBackend, "redis": RedisBackend}
+
+
+def make_backend(name: str, max_entries: int, max_bytes: int, kind: str = CACHE_BACKEND):
+    """Backend for one cache namespace; falls back to memory if the shared store is unusable."""
+    if kind not in BACKENDS:
+        logger.warning(f"Unknown CACHE_BACKEND '{kind}', using memory")
+        kind = "memory"
+    try:
+        return BACKENDS[kind](name, max_entries, max_bytes)
+    except (RuntimeError, ValueError, sqlite3.Error) as e:
+        logger.error(f"{name} cache: {kind} backend unavailable, using memory: {str(e)}")
+        return MemoryBackend(name, max_entries, max_bytes)
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from sel import get_driver
+from metrics import timed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DRIVER_POOL_MIN = int(os.getenv("DRIVER_POOL_MIN", "1"))
+DRIVER_POOL_MAX = int(os.getenv("DRIVER_POOL_MAX", "4"))
+DRIVER_MAX_NAVIGATIONS = int(os.getenv("DRIVER_MAX_NAVIGATIONS", "50"))
+DRIVER_CHECKOUT_TIMEOUT = float(os.getenv("DRIVER_CHECKOUT_TIMEOUT", "60"))
+
+
+class PooledDriver:
+    """Thin proxy around a WebDriver that counts navigations for recycling."""
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.navigations = 0
+        self.created_at = time.monotonic()
+        self.needs_check = False
+
+    def get(self, url):
+        self.navigations += 1
+        return self._driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+class DriverPool:
+    def __init__(self, min_size: int = DRIVER_POOL_MIN, max_size: int = DRIVER_POOL_MAX,
+                 max_navigations: int = DRIVER_MAX_NAVIGATIONS, headless: bool = True):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_navigations = max_navigations
+        self.headless = headless
+        self._idle: list[PooledDriver] = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    # --- Lifecycle ---
+    def _create(self) -> PooledDriver:
+        logger.info("Starting new pooled Chrome driver")
+        return PooledDriver(get_driver(headless=self.headless))
+
+    def _destroy(self, pooled: PooledDriver):
+        try:
+            pooled._driver.quit()
+        except Exception as e:
+            logger.warning(f"Failed to quit driver: {str(e)}")
+
+    def prewarm(self):
+        """Start drivers until the pool holds `min_size` idle sessions."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._create()
+            except Exception as e:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                logger.error(f"Failed to pre-warm driver pool: {str(e)}")
+                return
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._destroy(pooled)
+        logger.info("Driver pool closed")
+
+    # --- Health ---
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled._driver.execute_script("return 1;")
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled driver failed health check: {str(e)}")
+            return False
+
+    def _reset(self, pooled: PooledDriver):
+        driver = pooled._driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.switch_to.default_content()
+
+    # --- Checkout / checkin ---
+    @timed("driver_checkout")
+    def checkout(self, timeout: float = DRIVER_CHECKOUT_TIMEOUT) -> PooledDriver:
+        deadline = time.monotonic() + timeout
+        while True:
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutException(f"No driver available within {timeout}s")
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    return self._create()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if pooled.needs_check and not self._is_healthy(pooled):
+                self._discard(pooled)
+                continue
+            return pooled
+
+    def checkin(self, pooled: PooledDriver):
+        recycle = pooled.navigations >= self.max_navigations
+        if pooled.needs_check and not recycle:
+            recycle = not self._is_healthy(pooled)
+        if not recycle:
+            try:
+                self._reset(pooled)
+                pooled.needs_check = False
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled driver: {str(e)}")
+                recycle = True
+
+        if recycle:
+            logger.info(f"Recycling driver after {pooled.navigations} navigations")
+            self._discard(pooled)
+            threading.Thread(target=self.prewarm, daemon=True).start()
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                discard = True
+            else:
+                self._idle.append(pooled)
+                discard = False
+            self._cond.notify()
+        if discard:
+            self._destroy(pooled)
+
+    def _discard(self, pooled: PooledDriver):
+        self._destroy(pooled)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: float = DRIVER_CHECKOUT_TIMEOUT):
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled
+        except WebDriverException:
+            # Crashed sessions surface as WebDriverException; verify before reuse
+            pooled.needs_check = True
+            raise
+        finally:
+            self.checkin(pooled)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+
+driver_pool = DriverPool()
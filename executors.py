@@ -0,0 +1,161 @@
+import os
+import time
+import asyncio
+import contextvars
+import threading
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from driver_pool import driver_pool
+from metrics import record_stage
+from llm_client import llm_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HTTP_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "8"))
+ENDPOINT_CONCURRENCY = int(os.getenv("ENDPOINT_CONCURRENCY", "8"))
+
+
+class BoundedExecutor:
+    """Thread pool for blocking work that keeps queue depth and wait-time stats."""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry request-scoped context vars (progress listener, request id) into the worker
+        context = contextvars.copy_context()
+        submitted = time.monotonic()
+        with self._lock:
+            self.queued += 1
+
+        def call():
+            waited = time.monotonic() - submitted
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+            if waited > 1:
+                logger.info(f"{self.name} job waited {waited:.2f}s for a worker")
+            context.run(record_stage, f"{self.name}_queue", waited)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        return await loop.run_in_executor(self._pool, call)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "avg_wait_seconds": round(self.total_wait / started, 4) if started else 0.0,
+                "max_wait_seconds": round(self.max_wait, 4),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class EndpointLimiter:
+    """Per-endpoint asyncio semaphores; limits come from ENDPOINT_LIMIT_<NAME>."""
+
+    def __init__(self, default_limit: int = ENDPOINT_CONCURRENCY):
+        self.default_limit = default_limit
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, dict] = {}
+
+    def _get(self, name: str) -> asyncio.Semaphore:
+        if name not in self._semaphores:
+            limit = int(os.getenv(f"ENDPOINT_LIMIT_{name.upper()}", self.default_limit))
+            self._semaphores[name] = asyncio.Semaphore(limit)
+            self._stats[name] = {"limit": limit, "waiting": 0, "active": 0,
+                                 "completed": 0, "total_wait": 0.0, "max_wait": 0.0}
+        return self._semaphores[name]
+
+    @asynccontextmanager
+    async def limit(self, name: str):
+        semaphore = self._get(name)
+        stats = self._stats[name]
+        start = time.monotonic()
+        stats["waiting"] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats["waiting"] -= 1
+        waited = time.monotonic() - start
+        stats["active"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+        try:
+            yield
+        finally:
+            stats["active"] -= 1
+            stats["completed"] += 1
+            semaphore.release()
+
+    def stats(self) -> dict:
+        result = {}
+        for name, s in self._stats.items():
+            started = s["completed"] + s["active"]
+            result[name] = {
+                "limit": s["limit"],
+                "waiting": s["waiting"],
+                "active": s["active"],
+                "completed": s["completed"],
+                "avg_wait_seconds": round(s["total_wait"] / started, 4) if started else 0.0,
+                "max_wait_seconds": round(s["max_wait"], 4),
+            }
+        return result
+
+
+# Browser work is sized to the driver pool so jobs never wait on a checkout inside a worker
+browser_executor = BoundedExecutor("browser", driver_pool.max_size)
+http_executor = BoundedExecutor("http", HTTP_MAX_CONCURRENCY)
+endpoint_limiter = EndpointLimiter()
+
+
+async def run_with_driver(fn, *args, **kwargs):
+    """Run `fn(*args, driver=<pooled driver>, **kwargs)` on the browser executor."""
+    def call():
+        with driver_pool.driver() as driver:
+            return fn(*args, driver=driver, **kwargs)
+    return await browser_executor.run(call)
+
+
+def interactive_load() -> float:
+    """Fraction of browser capacity busy or queued for interactive requests."""
+    stats = browser_executor.stats()
+    return (stats["queued"] + stats["running"]) / browser_executor.max_workers
+
+
+def executor_stats() -> dict:
+    return {
+        "browser": browser_executor.stats(),
+        "llm": llm_client.stats(),
+        "http": http_executor.stats(),
+        "endpoints": endpoint_limiter.stats(),
+        "driver_pool": driver_pool.stats(),
+    }
+
+
+def shutdown_executors():
+    browser_executor.shutdown()
+    http_executor.shutdown()
@@ -0,0 +1,143 @@
+import os
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INTENTS = ["movers", "single", "news", "sector", "chart", "message"]
+# Intents refined by the LLM unless a request says otherwise. Every intent by default; operators
+# opt fixed-shape results out to template rendering, e.g. LLM_REFINE_INTENTS=message. Keep
+# "message" (chitchat, errors) in the list, since a templated reply there reads poorly.
+LLM_REFINE_INTENTS = {
+    intent.strip() for intent in os.getenv("LLM_REFINE_INTENTS", ",".join(INTENTS)).split(",") if intent.strip()
+}
+FORMAT_MAX_ROWS = int(os.getenv("FORMAT_MAX_ROWS", "25"))
+SECTOR_COLUMNS = ["Symbol", "Price", "Change %", "Volume", "Market cap", "Analyst Rating"]
+
+
+def response_intent(raw_output) -> str:
+    """Classify a raw_output by shape: movers, single, news, sector, chart or message."""
+    if not isinstance(raw_output, dict):
+        return "message"
+    stocks = raw_output.get("stocks") or []
+    if stocks and all("Ticker" in s for s in stocks):
+        return "movers"
+    if stocks and all("symbol" in s for s in stocks):
+        return "single"
+    if raw_output.get("news"):
+        return "news"
+    if raw_output.get("data"):
+        return "sector"
+    if raw_output.get("status") and raw_output.get("message"):
+        return "chart"
+    return "message"
+
+
+def use_llm_refine(raw_output, refine: bool | None = None) -> bool:
+    """An explicit per-request choice wins; otherwise the intent decides."""
+    if refine is not None:
+        return refine
+    return response_intent(raw_output) in LLM_REFINE_INTENTS
+
+
+def _more(total: int, shown: int) -> list[str]:
+    return [f"- ...and {total - shown} more"] if total > shown else []
+
+
+def _format_movers(raw_output: dict) -> list[str]:
+    stocks = raw_output["stocks"]
+    lines = ["**Stock Info:**"]
+    for s in stocks[:FORMAT_MAX_ROWS]:
+        lines.append(f"- {s['Ticker']}: {s.get('Price', 'N/A')} ({s.get('Change', 'N/A')}), Volume: {s.get('Volume', 'N/A')}")
+    lines += _more(len(stocks), FORMAT_MAX_ROWS)
+
+    # build_stocks_response ends its message with the best performer
+    last_line = raw_output.get("message", "").splitlines()[-1:]
+    if last_line and last_line[0].startswith("Best performing"):
+        lines += ["", last_line[0]]
+    return lines
+
+
+def _format_single(raw_output: dict) -> list[str]:
+    stocks = raw_output["stocks"]
+    lines = ["**Stock Info:**"]
+    for s in stocks:
+        lines.append(f"- {s['symbol']}: {s.get('price', 'N/A')}")
+        for label, value in (s.get("key_stats_html") or {}).items():
+            lines.append(f"  - {label}: {value}")
+
+    performance = [(s["symbol"], s.get("performance") or {}) for s in stocks]
+    if any(perf for _, perf in performance):
+        lines += ["", "**Performance History:**"]
+        for symbol, perf in performance:
+            if not perf:
+                continue
+            history = ", ".join(f"{label}: {value}" for label, value in perf.items())
+            lines.append(f"- {symbol}: {history}" if len(stocks) > 1 else f"- {history}")
+
+    if any(s.get("chart_image_url") or s.get("chart_image_base64") for s in stocks):
+        lines += ["", "**Stock Chart:**", "- Chart attached below."]
+
+    # Comparisons note tickers that failed on the last line of their message
+    last_line = raw_output.get("message", "").splitlines()[-1:]
+    if last_line and last_line[0].startswith("Could not fetch"):
+        lines += ["", last_line[0]]
+    return lines
+
+
+def _format_news(raw_output: dict) -> list[str]:
+    lines = ["**News Headlines:**"]
+    for item in raw_output["news"]:
+        when = f" ({item['time']})" if item.get("time") else ""
+        lines.append(f"- {item.get('title') or 'Untitled'}{when}")
+    return lines
+
+
+def _format_sector(raw_output: dict) -> list[str]:
+    rows = raw_output["data"]
+    columns = [c for c in SECTOR_COLUMNS if any(c in row for row in rows)]
+    lines = ["**Stock Info:**", "| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for row in rows[:FORMAT_MAX_ROWS]:
+        lines.append("| " + " | ".join(str(row.get(c, "")) for c in columns) + " |")
+    if len(rows) > FORMAT_MAX_ROWS:
+        lines.append(f"...and {len(rows) - FORMAT_MAX_ROWS} more")
+
+    summary = raw_output.get("summary") or {}
+    change = (summary.get("columns") or {}).get("Change %")
+    if change:
+        lines += ["", f"- Across {summary.get('rows', len(rows))} stocks: advancing {summary.get('advancers', 0)}, "
+                      f"declining {summary.get('decliners', 0)}, average change {change['mean']:+.2f}%"]
+    return lines
+
+
+def _format_chart(raw_output: dict) -> list[str]:
+    return ["**Stock Chart:**", f"- {raw_output['message']}"]
+
+
+FORMATTERS = {
+    "movers": _format_movers,
+    "single": _format_single,
+    "news": _format_news,
+    "sector": _format_sector,
+    "chart": _format_chart,
+}
+
+
+def format_response(raw_output) -> str:
+    """Render raw_output into the same sections the refinement LLM is asked to produce."""
+    intent = response_intent(raw_output)
+    formatter = FORMATTERS.get(intent)
+    if formatter is None:
+        message = raw_output.get("message") if isinstance(raw_output, dict) else None
+        return message or "Data not available"
+    try:
+        lines = formatter(raw_output)
+    except (KeyError, TypeError, AttributeError) as e:
+        logger.warning(f"Template formatting failed for intent '{intent}': {str(e)}")
+        return raw_output.get("message") or "Data not available"
+
+    # Headline messages ("Found 20 stocks in Finance sector") lead; list-style ones repeat the rows
+    message = raw_output.get("message", "")
+    if intent in ("news", "sector") and message:
+        lines = [message, ""] + lines
+    return "\n".join(lines)
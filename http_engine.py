@@ -0,0 +1,233 @@
+import os
+import time
+import logging
+import urllib3
+from sel import sector_url, sector_records, SECTOR_EXPECTED_COLUMNS
+from metrics import timed
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+except ImportError:  # lxml/cssselect are optional; without them every scrape goes through Selenium
+    lxml = None
+    CSSSelector = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "auto": try plain HTTP first and fall back to Selenium; "selenium": always use the browser
+SCRAPE_ENGINE = os.getenv("SCRAPE_ENGINE", "auto").lower()
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "8"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+# After a page fails over HTTP (error, or no server-rendered rows), go straight to Selenium for it this long
+HTTP_FAILURE_TTL = float(os.getenv("HTTP_FAILURE_TTL", "300"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
+)
+
+
+# Elements that innerText puts on their own line; table cells are separated by tabs
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "nav", "ol", "p", "pre", "section", "table", "tbody", "thead", "tfoot", "tr", "ul",
+}
+CELL_TAGS = {"td", "th"}
+SKIPPED_TAGS = {"script", "style", "template", "noscript"}
+
+
+def _text(elem) -> str:
+    """
+    Approximate Selenium's `innerText.trim()` so both engines put the same strings in the
+    cache: block children on their own lines, cells tab-separated, adjacent inline elements
+    ("<span>182.50</span><span>USD</span>") kept apart by a space, whitespace collapsed per line.
+    """
+    parts = []
+
+    def gap(separator: str):
+        if parts and not parts[-1].endswith(("\n", "\t", " ")):
+            parts.append(separator)
+
+    def walk(node, top: bool):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag is None or tag in SKIPPED_TAGS:
+            return
+        if not top:
+            if tag == "br" or tag in BLOCK_TAGS:
+                parts.append("\n")
+            elif tag in CELL_TAGS:
+                gap("\t")
+            else:
+                gap(" ")
+        # Source tabs are plain whitespace; only cell boundaries become tabs
+        if node.text:
+            parts.append(node.text.replace("\t", " "))
+        for child in node:
+            walk(child, False)
+            if child.tail:
+                parts.append(child.tail.replace("\t", " "))
+        if not top and tag in BLOCK_TAGS:
+            parts.append("\n")
+
+    walk(elem, True)
+    lines = (
+        "\t".join(" ".join(cell.split()) for cell in line.split("\t")).strip("\t")
+        for line in "".join(parts).split("\n")
+    )
+    return "\n".join(line for line in lines if line)
+
+
+class HttpEngine:
+    """
+    Browserless extraction for server-rendered pages. Every method returns None when the
+    expected rows are missing from the initial HTML, so callers fall back to Selenium.
+    """
+
+    def __init__(self, enabled: bool = SCRAPE_ENGINE == "auto"):
+        self.enabled = enabled and lxml is not None
+        if enabled and lxml is None:
+            logger.warning("lxml/cssselect not installed; HTTP extraction engine disabled")
+        self._http = urllib3.PoolManager(
+            maxsize=HTTP_POOL_MAXSIZE,
+            block=False,
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html", "Accept-Encoding": "gzip"},
+            timeout=urllib3.Timeout(total=HTTP_TIMEOUT),
+            retries=urllib3.Retry(total=1, redirect=3),
+        )
+        self._selectors: dict[str, "CSSSelector"] = {}
+        self._failed_until: dict[str, float] = {}
+        self.hits = 0
+        self.fallbacks = 0
+        self.skipped = 0
+
+    def _select(self, root, selector: str) -> list:
+        if selector not in self._selectors:
+            self._selectors[selector] = CSSSelector(selector)
+        return self._selectors[selector](root)
+
+    @timed("http_fetch")
+    def fetch(self, url: str):
+        try:
+            response = self._http.request("GET", url)
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed for {url}: {str(e)}")
+            return None
+        if response.status != 200:
+            logger.info(f"HTTP fetch for {url} returned {response.status}")
+            return None
+        return lxml.html.fromstring(response.data)
+
+    def _miss(self, reason: str, failed_url: str | None = None):
+        """Fall back to Selenium; `failed_url` marks a page that won't work over HTTP for a while."""
+        self.fallbacks += 1
+        if failed_url is not None and HTTP_FAILURE_TTL > 0:
+            self._failed_until[failed_url] = time.monotonic() + HTTP_FAILURE_TTL
+        logger.info(f"HTTP engine falling back to Selenium: {reason}")
+        return None
+
+    def _should_try(self, url: str) -> bool:
+        if not self.enabled:
+            return False
+        until = self._failed_until.get(url)
+        if until is None:
+            return True
+        if time.monotonic() >= until:
+            self._failed_until.pop(url, None)
+            return True
+        self.skipped += 1
+        return False
+
+    def scrape_stocks(
+        self,
+        url: str,
+        row_selector="table tbody tr",
+        ticker_selector="a[href*='/symbols/']",
+        price_selector="td:nth-child(3)",
+        change_percent_selector="td:nth-child(2)",
+        volume_selector="td:nth-child(4)",
+        max_stocks: int = 100
+    ):
+        if not self._should_try(url):
+            return None
+        root = self.fetch(url)
+        if root is None:
+            return self._miss(f"no page for {url}", failed_url=url)
+
+        rows = self._select(root, row_selector)[:max_stocks]
+        stocks = []
+        for row in rows:
+            cells = []
+            for selector in (ticker_selector, price_selector, change_percent_selector, volume_selector):
+                found = self._select(row, selector)
+                cells.append(_text(found[0]) if found else None)
+            if None in cells:
+                continue
+            ticker, price, change_percent, volume = cells
+            stocks.append({
+                "ticker": ticker,
+                "price": price,
+                "change_percent": change_percent,
+                "volume": volume
+            })
+
+        if not stocks:
+            return self._miss(f"no stock rows in initial HTML of {url}", failed_url=url)
+        # As with sectors, rows past the first screen only render in a browser
+        if len(stocks) < max_stocks:
+            return self._miss(f"initial HTML has {len(stocks)} rows, {max_stocks} requested")
+        self.hits += 1
+        return stocks
+
+    def scrape_sector(self, target_sector: str, count: int | str | None = None):
+        url = sector_url(target_sector)
+        if not self._should_try(url):
+            return None
+        limit = None
+        if count and str(count).lower() != "all":
+            try:
+                limit = int(count)
+            except ValueError:
+                limit = None
+        root = self.fetch(url)
+        if root is None:
+            return self._miss(f"no page for {url}", failed_url=url)
+
+        table = None
+        for table_selector in ("table.tv-data-table", "table"):
+            if self._select(root, f"{table_selector} tbody tr.listRow"):
+                table = table_selector
+                break
+        if table is None:
+            return self._miss(f"no sector rows in initial HTML of {url}", failed_url=url)
+
+        rows = self._select(root, f"{table} tbody tr.listRow")
+        # Infinite scroll only renders more rows in a browser; let Selenium handle larger asks
+        if limit is None or len(rows) < limit:
+            return self._miss(f"initial HTML has {len(rows)} rows, {count} requested")
+        rows = rows[:limit]
+
+        headers = [_text(th) for th in self._select(root, f"{table} thead tr th")][:SECTOR_EXPECTED_COLUMNS]
+        if not headers:
+            return self._miss("no table headers")
+        row_cells = [[_text(td) for td in self._select(row, "td")][:SECTOR_EXPECTED_COLUMNS] for row in rows]
+
+        all_data = sector_records(target_sector, headers, row_cells)
+        if not all_data:
+            return self._miss(f"no sector records for {target_sector}")
+        self.hits += 1
+        return all_data
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "skipped": self.skipped,
+            "failed_urls": sum(1 for until in list(self._failed_until.values()) if until > now),
+        }
+
+
+http_engine = HttpEngine()
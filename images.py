@@ -0,0 +1,121 @@
+import os
+import io
+import base64
+import hashlib
+import secrets
+import logging
+from pydantic import BaseModel
+from cache import TTLCache
+from metrics import timed
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it charts are delivered as captured PNG
+    Image = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHART_IMAGE_TTL = float(os.getenv("CHART_IMAGE_TTL", "300"))
+CHART_IMAGE_MAX_ENTRIES = int(os.getenv("CHART_IMAGE_MAX_ENTRIES", "256"))
+CHART_IMAGE_MAX_BYTES = int(os.getenv("CHART_IMAGE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+class ChartOptions(BaseModel):
+    delivery: str = "inline"  # "inline" (base64 in JSON) or "url" (short-lived /chart_image URL)
+    format: str = "png"  # "png", "webp" or "jpeg"
+    quality: int = 80
+    max_width: int | None = None
+
+
+def encode_chart(png: bytes, options: ChartOptions) -> tuple[bytes, str]:
+    """Downscale and re-encode a PNG capture; returns (bytes, media_type)."""
+    fmt = options.format.lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in MEDIA_TYPES:
+        logger.warning(f"Unsupported chart format '{options.format}', using png")
+        fmt = "png"
+    if Image is None:
+        if fmt != "png" or options.max_width:
+            logger.warning("Pillow not installed; delivering chart as captured PNG")
+        return png, MEDIA_TYPES["png"]
+    if fmt == "png" and not options.max_width:
+        return png, MEDIA_TYPES["png"]
+
+    try:
+        image = Image.open(io.BytesIO(png))
+        if options.max_width and image.width > options.max_width:
+            height = round(image.height * options.max_width / image.width)
+            image = image.resize((options.max_width, height), Image.LANCZOS)
+        if fmt == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+        out = io.BytesIO()
+        if fmt == "png":
+            image.save(out, format="PNG", optimize=True)
+        else:
+            image.save(out, format=fmt.upper(), quality=max(1, min(options.quality, 100)))
+        return out.getvalue(), MEDIA_TYPES[fmt]
+    except Exception as e:
+        logger.warning(f"Chart re-encoding failed, delivering original PNG: {str(e)}")
+        return png, MEDIA_TYPES["png"]
+
+
+class ChartImageStore:
+    """Short-lived chart images served by token from /chart_image/{token}."""
+
+    def __init__(self, ttl: float = CHART_IMAGE_TTL):
+        self.ttl = ttl
+        self._cache = TTLCache(
+            "chart_image",
+            ttl=ttl,
+            max_entries=CHART_IMAGE_MAX_ENTRIES,
+            max_bytes=CHART_IMAGE_MAX_BYTES,
+        )
+
+    def put(self, data: bytes, media_type: str) -> str:
+        token = secrets.token_urlsafe(16)
+        self._cache.set(token, {
+            "data": base64.b64encode(data).decode("ascii"),
+            "media_type": media_type,
+            "etag": hashlib.sha1(data).hexdigest(),
+        })
+        return token
+
+    def get(self, token: str) -> tuple[bytes, str, str, float] | None:
+        """Return (data, media_type, etag, seconds_left) or None if expired/unknown."""
+        cached = self._cache.get(token)
+        if cached is None:
+            return None
+        entry, age = cached
+        return base64.b64decode(entry["data"]), entry["media_type"], entry["etag"], max(0.0, self.ttl - age)
+
+    async def aget(self, token: str) -> tuple[bytes, str, str, float] | None:
+        return await self._cache.run_io(self.get, token)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+chart_image_store = ChartImageStore()
+
+
+@timed("chart_encode")
+def deliver_chart(stock: dict, options: ChartOptions) -> dict:
+    """Re-encode the captured chart and attach it inline or as a short-lived URL."""
+    chart_base64 = stock.get("chart_image_base64")
+    if not chart_base64:
+        return stock
+
+    data, media_type = encode_chart(base64.b64decode(chart_base64), options)
+    stock["chart_image_mime"] = media_type
+    if options.delivery == "url":
+        token = chart_image_store.put(data, media_type)
+        stock["chart_image_url"] = f"/chart_image/{token}"
+        stock["chart_image_base64"] = None
+    else:
+        stock["chart_image_base64"] = base64.b64encode(data).decode("utf-8")
+    return stock
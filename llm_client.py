@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-attempt request timeout given to the model client, which retries up to LLM_MAX_RETRIES times
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+# Overall deadline for one call, covering every attempt plus a little retry backoff
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", str(LLM_TIMEOUT * (LLM_MAX_RETRIES + 1) + 5)))
+# Calls are awaited on the event loop rather than parked on threads, so many can be in flight at once
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "32"))
+
+
+class AsyncLLMClient:
+    """
+    Awaits LangChain runnables through their native async APIs (`ainvoke`/`astream`) with a
+    cap on in-flight calls and a timeout, so chat turns share one model client without a
+    thread per call.
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, timeout: float = LLM_TIMEOUT,
+                 deadline: float = LLM_DEADLINE):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.deadline = deadline
+        self._semaphore = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+
+    def _gate(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    async def _acquire(self):
+        self.waiting += 1
+        try:
+            await self._gate().acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self, start: float, error: BaseException | None):
+        self.in_flight -= 1
+        self._gate().release()
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+        elif isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            # The caller went away; neither a model failure nor a completed call
+            pass
+        elif error is not None:
+            self.failures += 1
+        else:
+            self.completed += 1
+            self.total_seconds += time.monotonic() - start
+
+    async def ainvoke(self, runnable, value):
+        """`await runnable.ainvoke(value)`, bounded by the in-flight cap and the overall deadline."""
+        await self._acquire()
+        start = time.monotonic()
+        error = None
+        try:
+            return await asyncio.wait_for(runnable.ainvoke(value), self.deadline)
+        except asyncio.TimeoutError as e:
+            error = e
+            logger.error(f"LLM call timed out after {self.deadline:g}s")
+            raise asyncio.TimeoutError(f"LLM call timed out after {self.deadline:g}s") from e
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(start, error)
+
+    async def astream(self, runnable, value):
+        """
+        Yield chunks from `runnable.astream(value)`. The first chunk may follow retries, so it
+        gets the overall deadline; after that the per-attempt timeout applies between chunks.
+        """
+        await self._acquire()
+        start = time.monotonic()
+        error = None
+        stream = runnable.astream(value)
+        wait = self.deadline
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), wait)
+                except StopAsyncIteration:
+                    break
+                wait = self.timeout
+                yield chunk
+        except asyncio.TimeoutError as e:
+            error = e
+            logger.error(f"LLM stream stalled for {wait:g}s")
+            raise asyncio.TimeoutError(f"LLM stream stalled for {wait:g}s") from e
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await stream.aclose()
+            self._release(start, error)
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "timeout_seconds": self.timeout,
+            "deadline_seconds": self.deadline,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "avg_seconds": round(self.total_seconds / self.completed, 4) if self.completed else 0.0,
+        }
+
+
+llm_client = AsyncLLMClient()
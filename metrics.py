@@ -0,0 +1,144 @@
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+except ImportError:  # prometheus-client is optional; without it only per-request timings are kept
+    Counter = Histogram = generate_latest = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Chat turns range from milliseconds (cache hits) to a minute (cold Chrome + scroll + LLM)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+if Histogram is not None:
+    STAGE_SECONDS = Histogram(
+        "eyeonstox_stage_seconds", "Time spent in each request stage", ["stage"], buckets=LATENCY_BUCKETS
+    )
+    STAGE_ERRORS = Counter("eyeonstox_stage_errors_total", "Stages that raised an exception", ["stage"])
+    REQUEST_SECONDS = Histogram(
+        "eyeonstox_request_seconds", "End-to-end request latency", ["endpoint"], buckets=LATENCY_BUCKETS
+    )
+    REQUESTS = Counter("eyeonstox_requests_total", "Requests served", ["endpoint", "status"])
+    SINGLEFLIGHT_CALLS = Counter(
+        "eyeonstox_singleflight_calls_total", "Coalescable calls by whether they ran or joined in-flight work",
+        ["flight", "kind", "outcome"]
+    )
+else:
+    STAGE_SECONDS = STAGE_ERRORS = REQUEST_SECONDS = REQUESTS = SINGLEFLIGHT_CALLS = None
+    logger.warning("prometheus-client not installed; /metrics is disabled")
+
+
+class RequestTrace:
+    """Timeline of stage spans for one request; spans may nest (e.g. screenshot inside extraction)."""
+
+    def __init__(self, request_id: str, endpoint: str):
+        self.request_id = request_id
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self._spans: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, start: float, duration: float, error: bool = False):
+        span = {
+            "stage": stage,
+            "start_ms": round((start - self.started) * 1000, 1),
+            "duration_ms": round(duration * 1000, 1),
+        }
+        if error:
+            span["error"] = True
+        with self._lock:
+            self._spans.append(span)
+
+    def breakdown(self) -> dict:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s["start_ms"])
+        totals: dict[str, float] = {}
+        for s in spans:
+            totals[s["stage"]] = round(totals.get(s["stage"], 0.0) + s["duration_ms"], 1)
+        return {
+            "request_id": self.request_id,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stage_totals_ms": totals,
+            "spans": spans,
+        }
+
+
+# Per-request trace; executors copy the context into worker threads, like the progress listener
+_request_trace: ContextVar = ContextVar("request_trace", default=None)
+
+
+def start_trace(request_id: str, endpoint: str):
+    return _request_trace.set(RequestTrace(request_id, endpoint))
+
+
+def reset_trace(token):
+    _request_trace.reset(token)
+
+
+def current_trace() -> RequestTrace | None:
+    return _request_trace.get()
+
+
+def timing_breakdown() -> dict | None:
+    trace = _request_trace.get()
+    return trace.breakdown() if trace is not None else None
+
+
+def record_stage(stage: str, seconds: float, start: float | None = None, error: bool = False):
+    """Record an already measured stage (e.g. executor queue wait)."""
+    if STAGE_SECONDS is not None:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+        if error:
+            STAGE_ERRORS.labels(stage).inc()
+    trace = _request_trace.get()
+    if trace is not None:
+        trace.add(stage, start if start is not None else time.perf_counter() - seconds, seconds, error)
+
+
+@contextmanager
+def span(stage: str):
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, start, error)
+
+
+def timed(stage: str):
+    """Decorator form of `span` for functions that are a stage on their own."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_request(endpoint: str, status: int, seconds: float):
+    if REQUEST_SECONDS is None:
+        return
+    REQUEST_SECONDS.labels(endpoint).observe(seconds)
+    REQUESTS.labels(endpoint, str(status)).inc()
+
+
+def observe_singleflight(flight: str, kind: str, outcome: str):
+    if SINGLEFLIGHT_CALLS is not None:
+        SINGLEFLIGHT_CALLS.labels(flight, kind, outcome).inc()
+
+
+def render_metrics() -> bytes | None:
+    return generate_latest() if generate_latest is not None else None
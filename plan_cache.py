@@ -0,0 +1,134 @@
+import os
+import re
+import copy
+import logging
+from cache import TTLCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "3600"))
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "1024"))
+
+PLAN_ACTION_KEYS = ["actions", "actions_single", "actions_news", "action_sector", "actions_chart"]
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_PUNCT_RE = re.compile(r"[^\w#]+")
+
+
+def normalize_prompt(prompt: str) -> tuple[str, list[str]]:
+    """
+    Case-fold, collapse whitespace and punctuation, and pull numbers out as parameters:
+    "Top 5 gainers?" -> ("top # gainers", ["5"]).
+    """
+    text = prompt.casefold()
+    numbers = _NUMBER_RE.findall(text)
+    text = _NUMBER_RE.sub(" # ", text)
+    text = _PUNCT_RE.sub(" ", text)
+    return " ".join(text.split()), numbers
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _templatize(plan: dict, numbers: list[str]) -> dict | None:
+    """
+    Replace counts that came from the prompt with {"__param__": i} placeholders. Returns None
+    when a number isn't a count ("6 months", "3M"): the plan depends on it in a way a
+    placeholder can't express, so it must not be shared with prompts that differ there.
+    """
+    template = copy.deepcopy(plan)
+    values = [_as_number(n) for n in numbers]
+    used = set()
+    for key in PLAN_ACTION_KEYS:
+        for action in template.get(key) or []:
+            if not isinstance(action, dict):
+                continue
+            count = _as_number(action.get("count"))
+            if count is None:
+                continue
+            # Prefer a number not already taken, so "top 5 of 5" maps both occurrences
+            matches = [i for i, v in enumerate(values) if v == count]
+            free = [i for i in matches if i not in used]
+            if matches:
+                index = (free or matches)[0]
+                used.add(index)
+                action["count"] = {"__param__": index}
+    if len(used) != len(numbers):
+        return None
+    return template
+
+
+def _fill(template: dict, numbers: list[str]) -> dict | None:
+    plan = copy.deepcopy(template)
+    for key in PLAN_ACTION_KEYS:
+        for action in plan.get(key) or []:
+            if isinstance(action, dict) and isinstance(action.get("count"), dict):
+                index = action["count"].get("__param__")
+                if index is None or index >= len(numbers):
+                    return None
+                value = numbers[index]
+                action["count"] = int(float(value)) if float(value).is_integer() else float(value)
+    return plan
+
+
+class PlanCache:
+    def __init__(self, ttl: float = PLAN_CACHE_TTL, max_entries: int = PLAN_CACHE_MAX_ENTRIES,
+                 enabled: bool = PLAN_CACHE_ENABLED):
+        self.enabled = enabled
+        self._cache = TTLCache("plan", ttl=ttl, max_entries=max_entries)
+        self.skipped = 0
+
+    def get(self, prompt: str) -> dict | None:
+        if not self.enabled:
+            return None
+        key, numbers = normalize_prompt(prompt)
+        cached = self._cache.get((key, len(numbers)))
+        if cached is None:
+            self._cache.misses += 1
+            return None
+        plan = _fill(cached[0], numbers)
+        if plan is None:
+            self._cache.misses += 1
+            return None
+        self._cache.hits += 1
+        logger.info(f"Plan cache hit for '{key}'")
+        return plan
+
+    def set(self, prompt: str, plan: dict):
+        if not self.enabled or not isinstance(plan, dict):
+            return
+        key, numbers = normalize_prompt(prompt)
+        template = _templatize(plan, numbers)
+        if template is None:
+            self.skipped += 1
+            logger.info(f"Plan for '{key}' not cached: it depends on numbers other than counts")
+            return
+        self._cache.set((key, len(numbers)), template)
+
+    async def aget(self, prompt: str) -> dict | None:
+        return await self._cache.run_io(self.get, prompt)
+
+    async def aset(self, prompt: str, plan: dict):
+        await self._cache.run_io(self.set, prompt, plan)
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": stats["entries"],
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "evictions": stats["evictions"],
+            "skipped": self.skipped,
+        }
+
+
+plan_cache = PlanCache()
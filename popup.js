@@ -1,4 +1,8 @@
-const LLM_ACTION_API = "http://localhost:8000/llm_refine";
+const API_BASE = "http://localhost:8000";
+const LLM_STREAM_API = `${API_BASE}/llm_refine/stream`;
+
+// Ask for a compact WebP chart fetched separately, so the chat JSON stays small
+const CHART_OPTIONS = { delivery: "url", format: "webp", quality: 80, max_width: 640 };
 
 // Get DOM elements
 const chatContainer = document.getElementById("chat-container");
@@ -7,6 +11,7 @@ const userInput = document.getElementById("message");
 const sendBtn = document.getElementById("send-btn");
 const loadingDiv = document.getElementById("loading");
 const closeBtn = document.getElementById("chat-close");
+const loadingText = document.getElementById("loading-text");
 
 // Validate DOM elements
 if (!chatContainer || !chatBox || !userInput || !sendBtn || !loadingDiv || !closeBtn) {
@@ -19,50 +24,108 @@ closeBtn.addEventListener("click", () => {
     chatContainer.remove();
 });
 
+// Human-readable labels for server progress events
+const PROGRESS_LABELS = {
+    plan_ready: "Understanding your question",
+    page_loaded: "Loading market data",
+    rows_extracted: "Reading the data",
+    refining: "Writing the answer"
+};
+
+function setLoadingText(text) {
+    if (loadingText && loadingText.firstChild) {
+        loadingText.firstChild.nodeValue = text;
+    }
+}
+
+// Parse one SSE frame ("event: x\ndata: {...}") into {event, data}
+function parseSseFrame(frame) {
+    let event = "message";
+    const dataLines = [];
+    for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+    }
+    if (!dataLines.length) return null;
+    return { event, data: JSON.parse(dataLines.join("\n")) };
+}
+
+// Returns an image src for the first stock's chart: a served URL or an inline data URI
+function extractChart(data) {
+    if (!data || !Array.isArray(data.stocks) || data.stocks.length === 0) return null;
+    const stock = data.stocks[0];
+    if (stock.chart_image_url) return `${API_BASE}${stock.chart_image_url}`;
+    if (stock.chart_image_base64) {
+        const mime = stock.chart_image_mime || "image/png";
+        // Basic validation for base64 (check PNG header)
+        if (mime === "image/png" && !stock.chart_image_base64.startsWith('iVBORw0KGgo')) {
+            console.warn('Invalid base64 image data');
+            return null;
+        }
+        return `data:${mime};base64,${stock.chart_image_base64}`;
+    }
+    return null;
+}
+
 async function sendMessage() {
     const message = userInput.value.trim();
     if (!message) return;
 
     addMessage(message, "user");
     userInput.value = "";
+    setLoadingText("Preparing your response");
     loadingDiv.style.display = "block";
 
+    let botDiv = null;
     try {
-        const response = await fetch(LLM_ACTION_API, {
+        const response = await fetch(LLM_STREAM_API, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ prompt: message })
+            body: JSON.stringify({ prompt: message, chart: CHART_OPTIONS })
         });
 
-        if (!response.ok) {
+        if (!response.ok || !response.body) {
             throw new Error(`API error: ${response.status} ${response.statusText}`);
         }
 
-        const data = await response.json();
-        console.log('API Response:', data);
-
-        // Validate response structure
-        if (!data || typeof data !== 'object') {
-            throw new Error("Invalid API response format");
-        }
-
-        // Use refined_message or message, fallback to default
-        let displayMessage = data.refined_message || data.message || "No response received";
-        let chartBase64 = null;
-
-        // Safely access stocks and chart_image_base64
-        if (Array.isArray(data.stocks) && data.stocks.length > 0 && data.stocks[0].chart_image_base64){
-            chartBase64 = data.stocks[0].chart_image_base64;
-            // Basic validation for base64 (check PNG header)
-            if (!chartBase64.startsWith('iVBORw0KGgo')) {
-                console.warn('Invalid base64 image data');
-                chartBase64 = null;
-                displayMessage += "\nChart: Invalid image data";
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let finished = false;
+
+        while (!finished) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+                const frame = parseSseFrame(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+                if (!frame) continue;
+
+                if (frame.event === "progress") {
+                    setLoadingText(PROGRESS_LABELS[frame.data.stage] || "Working");
+                } else if (frame.event === "token") {
+                    // Render the refined message incrementally
+                    if (!botDiv) {
+                        botDiv = addMessage("", "bot");
+                        loadingDiv.style.display = "none";
+                    }
+                    botDiv.innerText += frame.data.text;
+                    chatBox.scrollTop = chatBox.scrollHeight;
+                } else if (frame.event === "done") {
+                    console.log('API Response:', frame.data);
+                    if (!botDiv) botDiv = addMessage("No response received", "bot");
+                    const chartSrc = extractChart(frame.data.raw_output);
+                    if (chartSrc) attachChart(botDiv, chartSrc);
+                    finished = true;
+                } else if (frame.event === "error") {
+                    throw new Error(frame.data.detail || "Streaming error");
+                }
             }
         }
 
-        addMessage(displayMessage, "bot", chartBase64);
-
     } catch (err) {
         console.error('Fetch error:', err);
         addMessage(`Error: ${err.message}`, "bot");
@@ -72,7 +135,7 @@ async function sendMessage() {
 }
 
 // The addMessage function to display text and image in the chat
-function addMessage(text, type, chartBase64 = null) {
+function addMessage(text, type, chartSrc = null) {
     const chatBox = document.getElementById("chat-box");
     const msgDiv = document.createElement("div");
     msgDiv.classList.add("message", type === "user" ? "user-message" : "bot-message");
@@ -81,23 +144,29 @@ function addMessage(text, type, chartBase64 = null) {
     // Add text
     msgDiv.innerText = text;
 
-    // If base64 chart data is provided, show it as an image
-    if (chartBase64) {
-        const img = document.createElement("img");
-        img.src = `data:image/png;base64,${chartBase64}`;
-        img.style.maxWidth = "100%";
-        img.style.marginTop = "8px";
-        // Handle image load errors
-        img.onerror = () => {
-            console.warn("Failed to load chart image");
-            msgDiv.innerText += "\nChart: Failed to load image";
-            img.remove(); // Remove broken image
-        };
-        msgDiv.appendChild(img);
+    // If chart data is provided, show it as an image
+    if (chartSrc) {
+        attachChart(msgDiv, chartSrc);
     }
 
     chatBox.appendChild(msgDiv);
     chatBox.scrollTop = chatBox.scrollHeight;
+    return msgDiv;
+}
+
+function attachChart(msgDiv, chartSrc) {
+    const img = document.createElement("img");
+    img.src = chartSrc;
+    img.style.maxWidth = "100%";
+    img.style.marginTop = "8px";
+    // Handle image load errors
+    img.onerror = () => {
+        console.warn("Failed to load chart image");
+        msgDiv.appendChild(document.createTextNode("\nChart: Failed to load image"));
+        img.remove(); // Remove broken image
+    };
+    msgDiv.appendChild(img);
+    chatBox.scrollTop = chatBox.scrollHeight;
 }
 
 // Bind send events
@@ -0,0 +1,145 @@
+import os
+import time
+import asyncio
+import logging
+from driver_pool import DriverPool
+from executors import BoundedExecutor, interactive_load
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Opt-in: it keeps a dedicated Chrome driver busy and lets requests be served from prefetched rows
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+PREFETCH_DRIVERS = int(os.getenv("PREFETCH_DRIVERS", "1"))
+PREFETCH_MOVERS_INTERVAL = float(os.getenv("PREFETCH_MOVERS_INTERVAL", "30"))
+PREFETCH_SECTORS_INTERVAL = float(os.getenv("PREFETCH_SECTORS_INTERVAL", "300"))
+PREFETCH_WATCHLIST_INTERVAL = float(os.getenv("PREFETCH_WATCHLIST_INTERVAL", "60"))
+PREFETCH_WATCHLIST = [t.strip().upper() for t in os.getenv("PREFETCH_WATCHLIST", "").split(",") if t.strip()]
+# Prefetched tables hold this many rows; smaller requests are served by slicing
+PREFETCH_TABLE_ROWS = int(os.getenv("PREFETCH_TABLE_ROWS", "100"))
+# Skip prefetch rounds while interactive browser load is above this fraction of capacity
+PREFETCH_BACKOFF_LOAD = float(os.getenv("PREFETCH_BACKOFF_LOAD", "0.75"))
+PREFETCH_MAX_BACKOFF = float(os.getenv("PREFETCH_MAX_BACKOFF", "300"))
+PREFETCH_TICK = 1.0
+
+
+class PrefetchJob:
+    def __init__(self, name: str, key, interval: float, fn, args: tuple, kwargs: dict, first_run: float):
+        self.name = name
+        self.key = key
+        self.interval = interval
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.next_run = first_run
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+
+
+class Prefetcher:
+    """
+    Refreshes hot pages on fixed intervals into the shared table cache. Jobs use the same
+    loaders as requests (plain HTTP first); their Selenium fallback runs on this scheduler's
+    own driver pool and executor so it never takes browser slots from interactive requests.
+    """
+
+    def __init__(self, cache, drivers: int = PREFETCH_DRIVERS, enabled: bool = PREFETCH_ENABLED):
+        self.cache = cache
+        self.enabled = enabled
+        self.pool = DriverPool(min_size=0, max_size=drivers)
+        self.executor = BoundedExecutor("prefetch", drivers)
+        self._jobs: list[PrefetchJob] = []
+        self._task = None
+        self._backoff = 0.0
+        self.skipped_rounds = 0
+        self.claimed_elsewhere = 0
+
+    def add(self, name: str, key, interval: float, fn, *args, **kwargs):
+        """Schedule `await fn(*args, **kwargs)`; a truthy result is stored under `key`."""
+        # Stagger first runs so startup doesn't fire every job at once
+        first_run = time.monotonic() + len(self._jobs) * 2
+        self._jobs.append(PrefetchJob(name, key, interval, fn, args, kwargs, first_run))
+
+    async def run_with_driver(self, fn, *args, **kwargs):
+        """Like executors.run_with_driver, on the prefetch pool; loaders take it as `browser`."""
+        def call():
+            with self.pool.driver() as driver:
+                return fn(*args, driver=driver, **kwargs)
+        return await self.executor.run(call)
+
+    def start(self):
+        if not self.enabled or not self._jobs or self._task is not None:
+            return
+        logger.info(f"Starting prefetch scheduler with {len(self._jobs)} jobs")
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.executor.shutdown()
+        self.pool.close()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(PREFETCH_TICK + self._backoff)
+
+            load = interactive_load()
+            if load >= PREFETCH_BACKOFF_LOAD:
+                self.skipped_rounds += 1
+                self._backoff = min(max(self._backoff * 2, PREFETCH_TICK), PREFETCH_MAX_BACKOFF)
+                logger.info(f"Interactive load {load:.2f}; backing off prefetch for {self._backoff:.0f}s")
+                continue
+            self._backoff = 0.0
+
+            now = time.monotonic()
+            due = [job for job in self._jobs if job.next_run <= now]
+            if due:
+                await asyncio.gather(*(self._run_job(job) for job in due))
+
+    async def _run_job(self, job: PrefetchJob):
+        # With a shared cache backend, one worker runs each job per interval and the rest reuse it
+        if not await self.cache.aclaim(("prefetch", job.name), job.interval * 0.9):
+            self.claimed_elsewhere += 1
+            job.next_run = time.monotonic() + job.interval
+            return
+
+        start = time.monotonic()
+        try:
+            value = await job.fn(*job.args, **job.kwargs)
+            if value:
+                await self.cache.aset(job.key, value)
+            else:
+                job.failures += 1
+        except Exception as e:
+            job.failures += 1
+            logger.warning(f"Prefetch job '{job.name}' failed: {str(e)}")
+        finally:
+            job.runs += 1
+            job.last_duration = round(time.monotonic() - start, 3)
+            job.next_run = time.monotonic() + job.interval
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "backoff_seconds": self._backoff,
+            "skipped_rounds": self.skipped_rounds,
+            "claimed_elsewhere": self.claimed_elsewhere,
+            "executor": self.executor.stats(),
+            "driver_pool": self.pool.stats(),
+            "jobs": {
+                job.name: {
+                    "interval": job.interval,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "last_duration_seconds": job.last_duration,
+                }
+                for job in self._jobs
+            },
+        }
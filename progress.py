@@ -0,0 +1,27 @@
+import logging
+from contextvars import ContextVar
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-request progress listener: callable(event: str, data: dict). Set by streaming endpoints;
+# executors copy the context into worker threads, so scrapers can report from any thread.
+_progress_listener: ContextVar = ContextVar("progress_listener", default=None)
+
+
+def set_progress_listener(listener):
+    return _progress_listener.set(listener)
+
+
+def reset_progress_listener(token):
+    _progress_listener.reset(token)
+
+
+def report_progress(stage: str, **data):
+    listener = _progress_listener.get()
+    if listener is None:
+        return
+    try:
+        listener("progress", {"stage": stage, **data})
+    except Exception as e:
+        logger.warning(f"Progress listener failed for stage '{stage}': {str(e)}")
@@ -0,0 +1,119 @@
+import os
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rough budget for the data block of the refine prompt; the instructions around it are fixed
+REFINE_TOKEN_BUDGET = int(os.getenv("REFINE_TOKEN_BUDGET", "1500"))
+REFINE_MAX_CELL_CHARS = int(os.getenv("REFINE_MAX_CELL_CHARS", "120"))
+CHARS_PER_TOKEN = 4
+
+# Fields that only matter to the UI (images, plan echo, timings) and never to the summary
+DROPPED_KEYS = {"actions", "debug", "chart_image_mime", "chart_image_url"}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _is_binary_key(key: str) -> bool:
+    return key.endswith("_base64") or key.endswith("_png")
+
+
+def _cell(value) -> str:
+    if isinstance(value, dict):
+        text = ", ".join(f"{k}={_cell(v)}" for k, v in value.items() if v not in (None, "", {}, []))
+    elif isinstance(value, list):
+        text = ", ".join(_cell(v) for v in value)
+    else:
+        text = " ".join(str(value).split())
+    if len(text) > REFINE_MAX_CELL_CHARS:
+        text = text[:REFINE_MAX_CELL_CHARS - 3] + "..."
+    return text.replace("|", "/")
+
+
+def _clean(value):
+    """Drop binary and UI-only fields, recursively."""
+    if isinstance(value, dict):
+        return {
+            k: _clean(v) for k, v in value.items()
+            if k not in DROPPED_KEYS and not _is_binary_key(k) and v not in (None, "", [], {})
+        }
+    if isinstance(value, list):
+        return [_clean(v) for v in value]
+    return value
+
+
+def _record_lines(record: dict) -> list[str]:
+    lines = []
+    for key, value in record.items():
+        if isinstance(value, dict):
+            lines.append(f"{key}:")
+            lines.extend(f"  {k}: {_cell(v)}" for k, v in value.items())
+        else:
+            lines.append(f"{key}: {_cell(value)}")
+    return lines
+
+
+def _table_lines(name: str, records: list[dict], budget_chars: int) -> list[str]:
+    # One header row plus pipe-separated rows; far denser than indented JSON
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    header = " | ".join(columns)
+    lines = [f"{name} ({len(records)} rows):", header]
+    used = len(lines[0]) + len(header) + 2
+    # Room for the "more rows omitted" footer, so it is never the part that gets truncated
+    footer_chars = len(f"... {len(records)} more rows omitted (showing {len(records)} of {len(records)})") + 1
+    shown = 0
+    for record in records:
+        row = " | ".join(_cell(record.get(column, "")) for column in columns)
+        reserve = 0 if shown == len(records) - 1 else footer_chars
+        if used + len(row) + 1 + reserve > budget_chars and shown:
+            break
+        lines.append(row)
+        used += len(row) + 1
+        shown += 1
+    if shown < len(records):
+        lines.append(f"... {len(records) - shown} more rows omitted (showing {shown} of {len(records)})")
+    return lines
+
+
+def compact_payload(raw_output, budget: int = REFINE_TOKEN_BUDGET) -> str:
+    """
+    Render a system response as compact text for the refine prompt: binary fields stripped,
+    record lists as pipe-separated tables, and rows truncated to stay within `budget` tokens.
+    """
+    if not isinstance(raw_output, dict):
+        return _cell(raw_output)[:budget * CHARS_PER_TOKEN]
+    payload = _clean(raw_output)
+    budget_chars = budget * CHARS_PER_TOKEN
+
+    tables = {k: v for k, v in payload.items() if isinstance(v, list) and v and all(isinstance(r, dict) for r in v)}
+    scalars = {k: v for k, v in payload.items() if k not in tables}
+
+    lines = []
+    message = scalars.pop("message", None)
+    if message:
+        # List responses repeat their rows in the message; keep only its gist when tables follow
+        text = str(message).strip()
+        if tables and len(text) > 300:
+            text = text[:297] + "..."
+        lines.append(f"message: {text}")
+    for key, value in scalars.items():
+        lines.extend(_record_lines({key: value}))
+
+    remaining = budget_chars - sum(len(line) + 1 for line in lines)
+    for index, (name, records) in enumerate(tables.items()):
+        # Split what's left evenly across the remaining tables
+        share = max(remaining // (len(tables) - index), 0)
+        if len(records) == 1:
+            block = [f"{name}:"] + [f"  {line}" for line in _record_lines(records[0])]
+        else:
+            block = _table_lines(name, records, share)
+        lines.extend(block)
+        remaining -= sum(len(line) + 1 for line in block)
+
+    text = "\n".join(lines)
+    if len(text) > budget_chars:
+        text = text[:budget_chars] + "\n... (truncated)"
+    return text
@@ -0,0 +1,272 @@
+import os
+import re
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+GAINERS_URL = "https://www.tradingview.com/markets/stocks-usa/market-movers-gainers/"
+LOSERS_URL = "https://www.tradingview.com/markets/stocks-usa/market-movers-losers/"
+SYMBOL_URL = "https://www.tradingview.com/symbols/{ticker}/"
+NEWS_URL = "https://www.tradingview.com/symbols/{ticker}/news/"
+
+# Same mapping the planner prompt documents, plus a few common names
+TICKER_MAP = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "google": "GOOGL",
+    "alphabet": "GOOGL",
+    "amazon": "AMZN",
+    "tesla": "TSLA",
+    "nvidia": "NVDA",
+    "infosys": "INFY",
+    "netflix": "NFLX",
+    "meta": "META",
+    "facebook": "META",
+    "intel": "INTC",
+    "amd": "AMD",
+}
+KNOWN_TICKERS = set(TICKER_MAP.values())
+
+SECTORS = [
+    "Commercial services", "Communications", "Consumer durables", "Consumer non-durables",
+    "Consumer services", "Distribution services", "Electronic technology", "Energy minerals", "Finance",
+    "Government", "Health services", "Health technology", "Industrial services", "Miscellaneous",
+    "Non-energy minerals", "Process industries", "Producer manufacturing", "Retail trade",
+    "Technology services", "Transportation", "Utilities",
+]
+
+# Chart timeframes use the button keys display_stock_chart understands
+TIMEFRAME_PATTERNS = [
+    (r"\b(1|one)\s*d(ay)?\b|\btoday\b|\bintraday\b", "1D"),
+    (r"\b(5|five)\s*d(ays?)?\b|\b(1|one)\s*w(eek)?\b", "5D"),
+    (r"\b(1|one)\s*m(onth|o)?\b", "1M"),
+    (r"\b(3|three)\s*m(onths?|o)?\b", "3M"),
+    (r"\b(6|six)\s*m(onths?|o)?\b", "6M"),
+    (r"\bytd\b|\byear to date\b", "YTD"),
+    (r"\b(5|five)\s*y(ears?|r)?\b|\b60m\b", "5Y"),
+    (r"\ball\s*time\b|\bmax\b", "ALL"),
+    (r"\b(1|one)\s*y(ear|r)?\b|\b12\s*m(onths)?\b|\byearly\b", "12M"),
+]
+
+_GAINER_RE = re.compile(r"\b(gainers?|best|top|winners?|highest|biggest gain\w*)\b")
+_LOSER_RE = re.compile(r"\b(losers?|worst|least|decliners?|bottom|lowest|biggest los\w*)\b")
+# "top 5 losers": the noun names the list, so it outranks generic words like "top" or "best"
+_GAINER_NOUN_RE = re.compile(r"\b(gainers?|winners?)\b")
+_LOSER_NOUN_RE = re.compile(r"\b(losers?|decliners?)\b")
+_STOCKS_RE = re.compile(r"\b(stocks?|gainers?|losers?|performers?|performing|movers?|shares)\b")
+_NEWS_RE = re.compile(r"\b(news|headlines?|articles?)\b")
+_CHART_RE = re.compile(r"\b(charts?|graphs?|plot)\b")
+_SINGLE_RE = re.compile(r"\b(price|stock|share|quote|details?|info|performance|doing|trading at)\b")
+# A count follows a count keyword ("top 5") or precedes the list noun ("5 losers", "5 best stocks")
+_COUNT_RE = re.compile(
+    r"\b(?:top|worst|best|bottom|latest|last|first)\s+(\d{1,3})\b"
+    r"|\b(\d{1,3})\s+(?:[a-z-]+\s+){0,2}?(?:stocks?|shares|gainers?|losers?|winners?|decliners?|movers?"
+    r"|performers?|companies|news|headlines?|articles?)\b"
+)
+# "last 30 days", "in 2024": the prompt asks about a period the live pages don't cover
+_TIME_SPAN_RE = re.compile(r"\b\d+\s*(?:d|days?|w|wks?|weeks?|m|mos?|months?|y|yrs?|years?|h|hrs?|hours?)\b")
+_YEAR_RE = re.compile(r"\b\d{4}\b")
+_CASHTAG_RE = re.compile(r"\$([A-Za-z]{1,5})\b")
+_UPPER_TICKER_RE = re.compile(r"\b([A-Z]{2,5})\b")
+_COMPARE_RE = re.compile(r"\b(compare|comparison|versus|vs)\b")
+_AMBIGUOUS_RE = re.compile(r"\b(why|should|predict|forecast|buy|sell)\b")
+
+# Sector rankings are computed server-side; plain "top N" keeps the page's own order
+_RANK_BEST_RE = re.compile(r"\b(best|gainers?|winners?|best performing|biggest gain\w*)\b")
+_RANK_WORST_RE = re.compile(r"\b(worst|losers?|decliners?|worst performing|biggest los\w*)\b")
+_RANK_HIGH_RE = re.compile(r"\b(highest|largest|biggest|most|top)\b")
+_RANK_LOW_RE = re.compile(r"\b(lowest|smallest|least|bottom|cheapest)\b")
+RANK_METRICS = [
+    (r"\bmarket\s*cap(italization)?\b", "Market cap"),
+    (r"\bvolume\b", "Volume"),
+    (r"\bp/?e\b|\bearnings ratio\b", "P/E"),
+    (r"\bdividends?\b", "Div yield %"),
+    (r"\bprice\b", "Price"),
+]
+
+
+def _find_tickers(prompt: str, text: str) -> list[str]:
+    tickers = []
+    for name, ticker in TICKER_MAP.items():
+        if re.search(rf"\b{name}\b", text):
+            tickers.append(ticker)
+    for tag in _CASHTAG_RE.findall(prompt):
+        tickers.append(tag.upper())
+    for token in _UPPER_TICKER_RE.findall(prompt):
+        if token in KNOWN_TICKERS:
+            tickers.append(token)
+    return list(dict.fromkeys(tickers))
+
+
+def _find_sector(text: str) -> str | None:
+    # Longest names first so "Consumer non-durables" wins over "Consumer durables"
+    for sector in sorted(SECTORS, key=len, reverse=True):
+        if sector.lower() in text:
+            return sector
+    return None
+
+
+def _find_count(text: str) -> int | None:
+    match = _COUNT_RE.search(text)
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def _find_timeframe(text: str) -> str | None:
+    """Chart button for the prompt; None for a span the buttons don't offer ("2 weeks")."""
+    for pattern, timeframe in TIMEFRAME_PATTERNS:
+        if re.search(pattern, text):
+            return timeframe
+    return None if _TIME_SPAN_RE.search(text) else "12M"
+
+
+def _find_ranking(text: str) -> dict:
+    """sort_by/order for a sector action, or {} to keep the page's order."""
+    for pattern, column in RANK_METRICS:
+        if re.search(pattern, text):
+            if _RANK_LOW_RE.search(text):
+                return {"sort_by": column, "order": "asc"}
+            if _RANK_HIGH_RE.search(text):
+                return {"sort_by": column, "order": "desc"}
+    if _RANK_WORST_RE.search(text):
+        return {"sort_by": "Change %", "order": "asc"}
+    if _RANK_BEST_RE.search(text):
+        return {"sort_by": "Change %", "order": "desc"}
+    return {}
+
+
+def _plan(**actions) -> dict:
+    plan = {key: [] for key in ("actions", "actions_single", "actions_news", "action_sector", "actions_chart")}
+    plan.update(actions)
+    plan["message"] = ""
+    return plan
+
+
+def _find_movers(text: str) -> tuple[bool, bool]:
+    gainer_noun, loser_noun = bool(_GAINER_NOUN_RE.search(text)), bool(_LOSER_NOUN_RE.search(text))
+    if gainer_noun != loser_noun:
+        return gainer_noun, loser_noun
+    mentions_stocks = bool(_STOCKS_RE.search(text))
+    return bool(_GAINER_RE.search(text)) and mentions_stocks, bool(_LOSER_RE.search(text)) and mentions_stocks
+
+
+def route(prompt: str) -> tuple[str, dict] | None:
+    """
+    Map common prompts to the same plan dicts the LLM planner returns.
+    Returns (intent, plan), or None when no pattern matches confidently.
+    """
+    text = prompt.casefold()
+    if _AMBIGUOUS_RE.search(text) or _YEAR_RE.search(text):
+        return None
+
+    tickers = _find_tickers(prompt, text)
+    sector = _find_sector(text)
+    count = _find_count(text)
+    is_news = bool(_NEWS_RE.search(text))
+    is_chart = bool(_CHART_RE.search(text))
+    is_gainers, is_losers = _find_movers(text)
+    is_compare = bool(_COMPARE_RE.search(text))
+
+    candidates = []
+    if is_compare:
+        if len(tickers) < 2 or is_news or is_chart:
+            return None
+        candidates.append("compare")
+    if is_news and len(tickers) == 1:
+        candidates.append("news")
+    if is_chart and len(tickers) == 1:
+        candidates.append("chart")
+    if sector and not tickers:
+        candidates.append("sector")
+    if is_gainers != is_losers and not tickers and not sector:
+        candidates.append("gainers" if is_gainers else "losers")
+    if not (is_news or is_chart or is_compare) and len(tickers) == 1 and _SINGLE_RE.search(text):
+        candidates.append("single")
+
+    if len(candidates) != 1:
+        return None
+    intent = candidates[0]
+    # Only charts take a time span (as a timeframe); elsewhere it isn't a count to guess at
+    if intent != "chart" and _TIME_SPAN_RE.search(text):
+        return None
+
+    if intent == "news":
+        ticker = tickers[0]
+        return intent, _plan(actions_news=[{
+            "action": "fetch_stock_news",
+            "url": NEWS_URL.format(ticker=ticker),
+            "symbol": ticker,
+            "count": count or 5,
+        }])
+    if intent == "chart":
+        timeframe = _find_timeframe(text)
+        if timeframe is None:
+            return None
+        return intent, _plan(actions_chart=[{
+            "action": "display_chart",
+            "ticker": tickers[0],
+            "timeframe": timeframe,
+        }])
+    if intent == "sector":
+        return intent, _plan(action_sector=[{
+            "action": "fetch_sector_data",
+            "sector": sector,
+            "count": "all" if re.search(r"\ball\b", text) else (count or 20),
+            **_find_ranking(text),
+        }])
+    if intent in ("gainers", "losers"):
+        return intent, _plan(actions=[
+            {"action": "navigate", "url": GAINERS_URL if intent == "gainers" else LOSERS_URL},
+            {"action": "extract", "selector": "table[class*='market-table'] tbody tr", "count": count or 10},
+        ])
+    # "single" and "compare" both emit one navigate/extract pair per ticker
+    actions_single = []
+    for ticker in tickers:
+        actions_single += [
+            {"action": "navigate_single", "url": SYMBOL_URL.format(ticker=ticker)},
+            {"action": "extract_single", "selector": "body", "fields": {
+                "symbol": "h1.apply-overflow-tooltip",
+                "price": "span.js-symbol-last",
+                "performance": "span.content-o1CQs_Mg",
+            }},
+        ]
+    return intent, _plan(actions_single=actions_single)
+
+
+class FastRouter:
+    def __init__(self, enabled: bool = FAST_ROUTER_ENABLED):
+        self.enabled = enabled
+        self.attempts = 0
+        self.hits = 0
+        self.intents: dict[str, int] = {}
+
+    def route(self, prompt: str) -> dict | None:
+        if not self.enabled:
+            return None
+        self.attempts += 1
+        try:
+            routed = route(prompt)
+        except Exception as e:
+            logger.warning(f"Fast router failed for '{prompt}': {str(e)}")
+            return None
+        if routed is None:
+            return None
+        intent, plan = routed
+        self.hits += 1
+        self.intents[intent] = self.intents.get(intent, 0) + 1
+        logger.info(f"Fast router matched intent '{intent}' for prompt: '{prompt}'")
+        return plan
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.attempts, 4) if self.attempts else 0.0,
+            "intents": dict(self.intents),
+        }
+
+
+fast_router = FastRouter()
@@ -9,15 +9,48 @@ from selenium.common.exceptions import TimeoutException
 import time
 import logging
 import base64, os, datetime
+import json
+from progress import report_progress
+from metrics import span, timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-CHROMEDRIVER_PATH = r"C:\Users\kumar\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
+CHROMEDRIVER_PATH = os.getenv(
+    "CHROMEDRIVER_PATH",
+    r"C:\Users\kumar\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
+)
+
+# "lean": eager page loads, heavy resources blocked, no warm-up navigation; "full": original behaviour
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "lean").lower()
+
+IMAGE_URL_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg"]
+HEAVY_URL_PATTERNS = [
+    # media and fonts
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # third-party trackers and ads
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*amplitude.com*", "*snowplow*",
+    "*telemetry.tradingview.com*",
+]
+
+
+def set_resource_blocking(driver, allow_images: bool = False):
+    """Block heavy resources via CDP; images can be re-enabled per page (e.g. chart capture)."""
+    if BROWSER_PROFILE != "lean":
+        return
+    patterns = HEAVY_URL_PATTERNS if allow_images else HEAVY_URL_PATTERNS + IMAGE_URL_PATTERNS
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.warning(f"Could not set resource blocking: {str(e)}")
+
 
 def get_driver(headless: bool = True):
     try:
         opts = Options()
+        lean = BROWSER_PROFILE == "lean"
         
         if headless:
             # Run in headless mode (good for scraping)
@@ -37,7 +70,17 @@ def get_driver(headless: bool = True):
             "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
         )
 
-        driver = webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=opts)
+        if lean:
+            # Return control at DOMContentLoaded; scrapers wait for their own elements
+            opts.page_load_strategy = "eager"
+
+        with span("chrome_startup"):
+            driver = webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=opts)
+
+        if lean:
+            set_resource_blocking(driver)
+            logger.info("Started Chrome with lean profile")
+            return driver
 
         driver.get("https://www.tradingview.com/")
         WebDriverWait(driver, 30).until(
@@ -51,6 +94,31 @@ def get_driver(headless: bool = True):
         raise
 
 
+# Pulls [ticker, price, change_percent, volume] for every row in one round-trip.
+# Missing cells come back as null so the row can be skipped like the per-element path does.
+BULK_STOCK_ROWS_JS = """
+const [rowSelector, selectors, maxRows] = arguments;
+const rows = Array.from(document.querySelectorAll(rowSelector)).slice(0, maxRows);
+return rows.map(row => selectors.map(sel => {
+    const el = row.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+}));
+"""
+
+
+def extract_stock_rows_bulk(driver, row_selector, selectors, max_rows):
+    """Return one list of cell texts per row via a single execute_script call, or None on failure."""
+    try:
+        rows = driver.execute_script(BULK_STOCK_ROWS_JS, row_selector, list(selectors), max_rows)
+    except Exception as e:
+        logger.warning(f"Bulk row extraction failed, falling back to per-element: {str(e)}")
+        return None
+    if not isinstance(rows, list):
+        return None
+    return rows
+
+
+@timed("extraction")
 def scrape_stocks(
     driver,
     row_selector="table tbody tr",
@@ -58,7 +126,8 @@ def scrape_stocks(
     price_selector="td:nth-child(3)",
     change_percent_selector="td:nth-child(2)",
     volume_selector="td:nth-child(4)",
-    max_stocks: int = 100
+    max_stocks: int = 100,
+    bulk: bool = True
 ):
     try:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
@@ -70,6 +139,32 @@ def scrape_stocks(
             EC.presence_of_element_located((By.CSS_SELECTOR, ticker_selector))
         )
 
+        if bulk:
+            bulk_rows = extract_stock_rows_bulk(
+                driver,
+                row_selector,
+                [ticker_selector, price_selector, change_percent_selector, volume_selector],
+                max_stocks
+            )
+            if bulk_rows:
+                stocks = []
+                for i, (ticker, price, change_percent, volume) in enumerate(bulk_rows):
+                    if None in (ticker, price, change_percent, volume):
+                        logger.warning(f"Error scraping row {i+1}: missing cell")
+                        continue
+                    stocks.append({
+                        "ticker": ticker,
+                        "price": price,
+                        "change_percent": change_percent,
+                        "volume": volume
+                    })
+
+                if not stocks:
+                    logger.warning("No stock data parsed from rows")
+
+                return stocks
+
+        # Per-element fallback: four WebDriver round-trips per row
         rows = driver.find_elements(By.CSS_SELECTOR, row_selector)[:max_stocks]
         if not rows:
             logger.error(f"No rows found with selector {row_selector}")
@@ -114,6 +209,24 @@ def scrape_stocks(
         return []
     
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@timed("screenshot")
+def capture_element_png(elem) -> bytes | None:
+    """Screenshot an element straight into memory; returns PNG bytes or None if invalid."""
+    try:
+        png = elem.screenshot_as_png
+    except Exception as e:
+        logger.warning(f"Could not capture element screenshot: {str(e)}")
+        return None
+    if not png or not png.startswith(PNG_SIGNATURE):
+        logger.warning("Invalid chart image captured")
+        return None
+    return png
+
+
+@timed("extraction")
 def scrape_single_stock(driver, symbol_selector, price_selector):
     try:
         wait = WebDriverWait(driver, 30)
@@ -188,7 +301,6 @@ def scrape_single_stock(driver, symbol_selector, price_selector):
             logger.warning(f"Could not extract key stats properly: {str(e)}")
 
 
-        chart_image_path = None
         chart_base64 = None
 
         try:
@@ -197,34 +309,13 @@ def scrape_single_stock(driver, symbol_selector, price_selector):
                 EC.presence_of_element_located((By.CSS_SELECTOR, "canvas.chart-canvas"))  # Specific class
             )
             canvases = driver.find_elements(By.CSS_SELECTOR, "canvas.chart-canvas")
-            
+
             if canvases:
                 chart_elem = canvases[0]  # Use first matching canvas or adjust logic
-                # Optionally resize browser window to ensure chart visibility
-                driver.set_window_size(800, 600)  # Adjust size as needed
-                
-                # Save screenshot to temporary file
-                chart_image_path = f"./{symbol}_chart.png"
-                chart_elem.screenshot(chart_image_path)
-
-                # Convert to base64
-                with open(chart_image_path, "rb") as img_file:
-                    chart_base64 = base64.b64encode(img_file.read()).decode("utf-8")
-                
-                # Basic validation of base64 (check if it starts with PNG header)
-                if chart_base64.startswith("iVBORw0KGgo"):
-                    logger.info(f"Chart screenshot saved at {chart_image_path} and converted to base64")
-                else:
-                    logger.warning("Invalid chart image captured")
-                    chart_base64 = None
-
-                # Clean up temporary file
-                try:
-                    os.remove(chart_image_path)
-                    logger.info(f"Temporary file {chart_image_path} deleted")
-                except OSError as e:
-                    logger.warning(f"Could not delete temporary file {chart_image_path}: {str(e)}")
-
+                chart_png = capture_element_png(chart_elem)
+                if chart_png:
+                    chart_base64 = base64.b64encode(chart_png).decode("utf-8")
+                    logger.info(f"Chart captured in memory for {symbol} ({len(chart_png)} bytes)")
             else:
                 logger.warning("No canvas elements found for chart")
         except TimeoutException:
@@ -235,8 +326,7 @@ def scrape_single_stock(driver, symbol_selector, price_selector):
             "price": price,
             "performance": performance,
             "key_stats_html": stats,
-            "chart_image": chart_image_path,
-            "chart_image_base64": chart_base64  
+            "chart_image_base64": chart_base64
         }
 
 
@@ -252,7 +342,8 @@ def scrape_single_stock(driver, symbol_selector, price_selector):
 
 def scrape_stock_news(driver, url, stock_ticker, max_news=5, days_limit=7):
 
-    driver.get(url)
+    with span("navigation"):
+        driver.get(url)
     
     try:
         WebDriverWait(driver, 10).until(
@@ -260,53 +351,177 @@ def scrape_stock_news(driver, url, stock_ticker, max_news=5, days_limit=7):
         )
     except TimeoutException:
         return []
+    report_progress("page_loaded", url=url)
 
-    news_items = []
-    news_divs = driver.find_elements(By.CSS_SELECTOR, "div[data-qa-id='news-headline-title']")
+    with span("extraction"):
+        news_items = []
+        news_divs = driver.find_elements(By.CSS_SELECTOR, "div[data-qa-id='news-headline-title']")
 
-    for div in news_divs[:max_news]:
-        try:
-            title = div.get_attribute("data-overflow-tooltip-text").strip()
-        except:
-            title = div.text.strip()
+        for div in news_divs[:max_news]:
+            try:
+                title = div.get_attribute("data-overflow-tooltip-text").strip()
+            except:
+                title = div.text.strip()
 
-        # Get link
-        try:
-            link_elem = div.find_element(By.TAG_NAME, "a")
-            link = link_elem.get_attribute("href").strip()
-        except:
-            link = None
+            # Get link
+            try:
+                link_elem = div.find_element(By.TAG_NAME, "a")
+                link = link_elem.get_attribute("href").strip()
+            except:
+                link = None
 
-        # Get date
-        try:
-            date_elem = div.find_element(By.XPATH, ".//following-sibling::span")
-            date_text = date_elem.text.strip()
-            news_time = None
+            # Get date
             try:
-                news_date = datetime.datetime.strptime(date_text, "%b %d, %Y")
-                # Filter by last `days_limit` days
-                if news_date < datetime.datetime.now() - datetime.timedelta(days=days_limit):
-                    continue
-                news_time = news_date.strftime("%Y-%m-%d %H:%M:%S")
+                date_elem = div.find_element(By.XPATH, ".//following-sibling::span")
+                date_text = date_elem.text.strip()
+                news_time = None
+                try:
+                    news_date = datetime.datetime.strptime(date_text, "%b %d, %Y")
+                    # Filter by last `days_limit` days
+                    if news_date < datetime.datetime.now() - datetime.timedelta(days=days_limit):
+                        continue
+                    news_time = news_date.strftime("%Y-%m-%d %H:%M:%S")
+                except:
+                    news_time = date_text
             except:
-                news_time = date_text
-        except:
-            news_time = None
+                news_time = None
 
-        news_items.append({
-            "title": title,
-            "link": link,
-            "time": news_time
-        })
+            news_items.append({
+                "title": title,
+                "link": link,
+                "time": news_time
+            })
 
     return news_items
 
+SCROLL_QUIET_MS = int(os.getenv("SCROLL_QUIET_MS", "1500"))
+SCROLL_MAX_ROUNDS = int(os.getenv("SCROLL_MAX_ROUNDS", "5"))
+
+# Scrolls to the bottom and watches the table body for inserted rows. Each batch of new rows
+# triggers another scroll round; resolves once the target is met, rows stop arriving for
+# quietMs, or maxRounds is used up.
+LOAD_ROWS_JS = """
+const [bodySelector, rowSelector, target, quietMs, maxRounds] = arguments;
+const done = arguments[arguments.length - 1];
+const body = document.querySelector(bodySelector) || document.body;
+const count = () => body.querySelectorAll(rowSelector).length;
+let rounds = 0, last = count(), timer = null, finished = false, observer = null;
+const finish = () => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    window.scrollTo(0, 0);
+    done({rows: count(), rounds: rounds});
+};
+const scroll = () => {
+    rounds += 1;
+    window.scrollTo(0, document.body.scrollHeight);
+    clearTimeout(timer);
+    timer = setTimeout(finish, quietMs);
+};
+if (target !== null && last >= target) {
+    finish();
+} else {
+    observer = new MutationObserver(() => {
+        const n = count();
+        if (n <= last) return;
+        last = n;
+        if ((target !== null && n >= target) || rounds >= maxRounds) return finish();
+        scroll();
+    });
+    observer.observe(body, {childList: true, subtree: true});
+    scroll();
+}
+"""
+
+
+@timed("scroll")
+def load_table_rows(driver, body_selector, row_selector="tr", target=None,
+                    quiet_ms: int = SCROLL_QUIET_MS, max_rounds: int = SCROLL_MAX_ROUNDS):
+    """Drive infinite scroll for a table; returns (row_count, scroll_rounds)."""
+    # Pooled drivers outlive this call, so the longer script timeout is put back afterwards
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(max_rounds * quiet_ms / 1000 + 10)
+    try:
+        result = driver.execute_async_script(
+            LOAD_ROWS_JS, body_selector, row_selector, target, quiet_ms, max_rounds
+        )
+        return result["rows"], result["rounds"]
+    except Exception as e:
+        logger.warning(f"Row loader failed: {str(e)}")
+        driver.execute_script("window.scrollTo(0, 0);")
+        return len(driver.find_elements(By.CSS_SELECTOR, f"{body_selector} {row_selector}")), 0
+    finally:
+        driver.set_script_timeout(previous_timeout)
+
+
+# Returns {"headers": [...], "rows": [[...], ...]} serialized as one JSON string
+BULK_TABLE_JS = """
+const [tableSelector, rowSelector, maxRows, maxCols] = arguments;
+const text = el => el.innerText.trim();
+const headers = Array.from(document.querySelectorAll(`${tableSelector} thead tr th`))
+    .slice(0, maxCols).map(text);
+let rows = Array.from(document.querySelectorAll(`${tableSelector} tbody ${rowSelector}`));
+if (maxRows !== null) rows = rows.slice(0, maxRows);
+return JSON.stringify({
+    headers: headers,
+    rows: rows.map(row => Array.from(row.querySelectorAll("td")).slice(0, maxCols).map(text))
+});
+"""
+
+
+def extract_table_bulk(driver, table_selector, row_selector, max_rows, max_cols):
+    """Return (headers, rows) for a table via one execute_script call, or None on failure."""
+    try:
+        payload = driver.execute_script(BULK_TABLE_JS, table_selector, row_selector, max_rows, max_cols)
+        table = json.loads(payload)
+        return table["headers"], table["rows"]
+    except Exception as e:
+        logger.warning(f"Bulk table extraction failed, falling back to per-element: {str(e)}")
+        return None
+
+
+SECTOR_URL_TEMPLATE = os.getenv(
+    "SECTOR_URL_TEMPLATE",
+    "https://in.tradingview.com/markets/stocks-usa/sectorandindustry-sector/{slug}/"
+)
+SECTOR_EXPECTED_COLUMNS = 11
+
+
+def sector_slug(target_sector: str) -> str:
+    return target_sector.lower().replace(" ", "-")
+
+
+def sector_url(target_sector: str) -> str:
+    return SECTOR_URL_TEMPLATE.format(slug=sector_slug(target_sector))
+
+
+def sector_records(target_sector: str, headers: list, row_cells: list) -> list[dict]:
+    """Turn a header list and row cell lists into sector records."""
+    all_data = []
+    for cells in row_cells:
+        if not cells:
+            continue
+
+        num_cols = min(len(cells), len(headers))
+        record = {headers[j]: cells[j] for j in range(num_cols)}
+        record["Sector"] = target_sector
+
+        if not all_data:  # log only first row for debug
+            logger.info(f"Sample row data: {record}")
+
+        all_data.append(record)
+    return all_data
+
+
 def scrape_sector(target_sector: str, driver, count: int | str | None = None):
     # Normalize sector name for URL (e.g., "Producer Manufacturing" -> "producer-manufacturing")
-    sector_url_slug = target_sector.lower().replace(" ", "-")
-    url = f"https://in.tradingview.com/markets/stocks-usa/sectorandindustry-sector/{sector_url_slug}/"
+    sector_url_slug = sector_slug(target_sector)
+    url = sector_url(target_sector)
     logger.info(f"Navigating to URL: {url}")
-    driver.get(url)
+    with span("navigation"):
+        driver.get(url)
 
     # Verify the loaded URL
     current_url = driver.current_url
@@ -335,31 +550,18 @@ def scrape_sector(target_sector: str, driver, count: int | str | None = None):
                 EC.presence_of_element_located((By.CSS_SELECTOR, f"{table_selector} tbody tr"))
             )
             logger.info(f"Fell back to generic table selector: {table_selector}")
+        report_progress("page_loaded", url=current_url)
 
-        prev_count = 0
-        for i in range(5):  # max 10 scrolls
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # small wait
-            rows = driver.find_elements(By.CSS_SELECTOR, f"{table_selector} tbody tr")
+        target = None
+        if count and str(count).lower() != "all":
+            try:
+                target = int(count)
+            except ValueError:
+                logger.warning(f"Invalid count '{count}', continuing full scrape")
 
-            # ✅ Stop early if enough rows are loaded
-            if count and str(count).lower() != "all":
-                try:
-                    limit = int(count)
-                    if len(rows) >= limit:
-                        logger.info(f"Reached requested {limit} rows, stopping scroll")
-                        break
-                except ValueError:
-                    logger.warning(f"Invalid count '{count}', continuing full scrape")
-
-            # Stop if no new rows are loaded
-            if len(rows) == prev_count:
-                break
-            prev_count = len(rows)
-
-        # Scroll back up
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
+        # Scroll until enough rows arrive or loading goes quiet, then back to the top
+        loaded, rounds = load_table_rows(driver, f"{table_selector} tbody", "tr", target=target)
+        logger.info(f"Loaded {loaded} rows in {rounds} scroll rounds")
 
         # Collect rows
         rows = wait.until(
@@ -368,6 +570,7 @@ def scrape_sector(target_sector: str, driver, count: int | str | None = None):
         logger.info(f"Found {len(rows)} rows before limiting")
 
         # Apply count limit
+        limit = None
         if count and str(count).lower() != "all":
             try:
                 limit = int(count)
@@ -376,31 +579,27 @@ def scrape_sector(target_sector: str, driver, count: int | str | None = None):
             except ValueError:
                 logger.warning(f"Invalid count '{count}', defaulting to all rows")
 
-        # Scrape headers
-        headers = [h.text.strip() for h in driver.find_elements(By.CSS_SELECTOR, f"{table_selector} thead tr th")]
+        expected_columns = SECTOR_EXPECTED_COLUMNS
+
+        # Headers and all row cells in one round-trip; per-element reads are the fallback
+        with span("extraction"):
+            table = extract_table_bulk(driver, table_selector, "tr.listRow", limit, expected_columns)
+            if table is not None:
+                headers, row_cells = table
+            else:
+                headers = [h.text.strip() for h in driver.find_elements(By.CSS_SELECTOR, f"{table_selector} thead tr th")]
+                headers = headers[:expected_columns]
+                row_cells = [
+                    [c.text.strip() for c in row.find_elements(By.TAG_NAME, "td")[:expected_columns]]
+                    for row in rows
+                ]
+
         if not headers:
             logger.error("No table headers found")
             return []
-
-        expected_columns = 11
-        headers = headers[:expected_columns]
         logger.info(f"Table headers: {headers}")
 
-        # Scrape row data
-        all_data = []
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if not cols:
-                continue
-
-            num_cols = min(len(cols), expected_columns)
-            record = {headers[j]: cols[j].text.strip() for j in range(num_cols)}
-            record["Sector"] = target_sector
-
-            if not all_data:  # log only first row for debug
-                logger.info(f"Sample row data: {record}")
-
-            all_data.append(record)
+        all_data = sector_records(target_sector, headers, row_cells)
 
         if not all_data:
             logger.warning(f"No data scraped for sector '{target_sector}'")
@@ -0,0 +1,76 @@
+import os
+import copy
+import asyncio
+import logging
+from metrics import span, observe_singleflight
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the work and every
+    caller that arrives while it is in flight awaits the same result instead of repeating it.
+    """
+
+    def __init__(self, name: str, enabled: bool = SINGLEFLIGHT_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._inflight: dict = {}
+        self.executed = 0
+        self.shared = 0
+        self._by_kind: dict[str, dict] = {}
+
+    def _count(self, key, outcome: str):
+        # Keys are tuples whose first element names the kind of work ("movers", "plan", ...)
+        kind = str(key[0]) if isinstance(key, tuple) and key else "other"
+        counts = self._by_kind.setdefault(kind, {"executed": 0, "shared": 0})
+        counts[outcome] += 1
+        observe_singleflight(self.name, kind, outcome)
+
+    async def do(self, key, loader, copy_result: bool = False):
+        """
+        Await `loader()` once per key across concurrent callers. With `copy_result`, each caller
+        gets its own deep copy so one caller mutating the result can't affect the others.
+        """
+        if not self.enabled:
+            return await loader()
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            self._count(key, "shared")
+            logger.info(f"{self.name} single-flight: joined in-flight work for {key}")
+            with span(f"{self.name}_coalesced"):
+                # Shielded so a disconnecting waiter doesn't cancel the work for everyone else
+                result = await asyncio.shield(task)
+        else:
+            self.executed += 1
+            self._count(key, "executed")
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+
+            def done(finished):
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+            task.add_done_callback(done)
+            result = await asyncio.shield(task)
+        return copy.deepcopy(result) if copy_result else result
+
+    def stats(self) -> dict:
+        calls = self.executed + self.shared
+        return {
+            "enabled": self.enabled,
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+            "dedup_rate": round(self.shared / calls, 4) if calls else 0.0,
+            "by_kind": {kind: dict(counts) for kind, counts in self._by_kind.items()},
+        }
+
+
+# Scrapes keyed by page and parameters; LLM calls keyed by their prompt
+scrape_flight = SingleFlight("scrape")
+llm_flight = SingleFlight("llm")
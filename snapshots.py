@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import datetime
+import threading
+from contextlib import closing
+from analytics import parse_number
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", "snapshots.db")
+SNAPSHOT_FLUSH_INTERVAL = float(os.getenv("SNAPSHOT_FLUSH_INTERVAL", "2"))
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "500"))
+SNAPSHOT_RETENTION_DAYS = float(os.getenv("SNAPSHOT_RETENTION_DAYS", "30"))
+# Writes are dropped (and counted) rather than blocking a request when the writer falls behind
+SNAPSHOT_QUEUE_MAX = int(os.getenv("SNAPSHOT_QUEUE_MAX", "10000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    price REAL,
+    change_percent REAL,
+    volume REAL,
+    market_cap REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_ticker_ts ON snapshots (ticker, ts);
+CREATE INDEX IF NOT EXISTS idx_snapshots_source_ts ON snapshots (source, ts);
+"""
+
+INSERT_SQL = """
+INSERT INTO snapshots (ts, source, ticker, price, change_percent, volume, market_cap, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def normalize_ticker(ticker: str) -> str:
+    # "NASDAQ-AAPL" (symbol URLs) and "AAPL\nApple Inc." (table cells) are the same ticker
+    parts = str(ticker).split()
+    return parts[0].upper().replace(":", "-").split("-")[-1] if parts else ""
+
+
+def since_timestamp(since: str | None = None, hours: float = 24) -> float:
+    """Window start: "today" (local midnight), an ISO datetime, unix seconds, or `hours` ago."""
+    if not since:
+        return time.time() - hours * 3600
+    if since.lower() == "today":
+        return datetime.datetime.combine(datetime.date.today(), datetime.time()).timestamp()
+    try:
+        return float(since)
+    except ValueError:
+        return datetime.datetime.fromisoformat(since).timestamp()
+
+
+def _number(value) -> float | None:
+    number = parse_number(value)
+    return None if number != number else number  # NaN -> NULL
+
+
+def _movers_rows(rows: list[dict]):
+    for row in rows:
+        yield row.get("ticker"), row.get("price"), row.get("change_percent"), row.get("volume"), None, row
+
+
+def _sector_rows(rows: list[dict]):
+    for row in rows:
+        yield (row.get("Symbol"), row.get("Price"), row.get("Change %"), row.get("Volume"),
+               row.get("Market cap"), row)
+
+
+def _single_rows(ticker: str, stock: dict):
+    # Performance history and key stats go into `data`; the chart image is left out
+    data = {k: v for k, v in stock.items() if not k.startswith("chart_image")}
+    stats = stock.get("key_stats_html") or {}
+    yield ticker, stock.get("price"), None, stats.get("Volume"), stats.get("Market capitalization"), data
+
+
+ROW_BUILDERS = {"movers": _movers_rows, "sector": _sector_rows}
+
+
+class SnapshotStore:
+    """
+    Append-only SQLite history of scraped rows, indexed by (ticker, ts). Requests only enqueue;
+    a writer thread parses and inserts in batches.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_DB_PATH, enabled: bool = SNAPSHOT_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._queue: queue.Queue = queue.Queue(maxsize=SNAPSHOT_QUEUE_MAX)
+        self._thread = None
+        self._stop = threading.Event()
+        # True once the schema exists; reads before that (or when disabled) find no history
+        self.ready = False
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failures = 0
+
+    # --- Connections ---
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        # `with conn` only commits; closing() releases the handle as well
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    # --- Lifecycle ---
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        try:
+            self._init_db()
+        except sqlite3.Error as e:
+            logger.error(f"Snapshot store disabled, could not open {self.path}: {str(e)}")
+            self.enabled = False
+            return
+        self.ready = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Snapshot store writing to {self.path}")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    # --- Writes (request path: enqueue only) ---
+    def _enqueue(self, kind: str, source: str, payload):
+        if not self.enabled or self._thread is None or not payload:
+            return
+        try:
+            self._queue.put_nowait((time.time(), kind, source, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def record_movers(self, url: str, rows: list[dict]):
+        name = "gainers" if "gainers" in url else "losers" if "losers" in url else url
+        self._enqueue("movers", f"movers:{name}", rows)
+
+    def record_sector(self, sector: str, rows: list[dict]):
+        self._enqueue("sector", f"sector:{sector.lower()}", rows)
+
+    def record_single(self, ticker: str, stock: dict):
+        self._enqueue("single", "single", (ticker, stock))
+
+    # --- Writer thread ---
+    def _rows(self, ts: float, kind: str, source: str, payload) -> list[tuple]:
+        builder = _single_rows(*payload) if kind == "single" else ROW_BUILDERS[kind](payload)
+        rows = []
+        for ticker, price, change, volume, market_cap, data in builder:
+            if not ticker:
+                continue
+            rows.append((
+                ts, source, normalize_ticker(ticker), _number(price), _number(change), _number(volume),
+                _number(market_cap), json.dumps(data, separators=(",", ":"), default=str)
+            ))
+        return rows
+
+    def _run(self):
+        conn = self._connect()
+        last_prune = 0.0
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = []
+                deadline = time.monotonic() + SNAPSHOT_FLUSH_INTERVAL
+                while len(batch) < SNAPSHOT_BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=min(remaining, 0.5))
+                    except queue.Empty:
+                        if self._stop.is_set():
+                            break
+                        continue
+                    try:
+                        batch.extend(self._rows(*item))
+                    except Exception as e:
+                        # One malformed payload must not take the writer thread down
+                        self.failures += 1
+                        logger.warning(f"Snapshot of {item[2]} skipped: {str(e)}")
+                if batch:
+                    self._write(conn, batch)
+                if time.monotonic() - last_prune > 3600:
+                    self._prune(conn)
+                    last_prune = time.monotonic()
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list[tuple]):
+        try:
+            with conn:
+                conn.executemany(INSERT_SQL, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as e:
+            self.failures += 1
+            logger.warning(f"Snapshot batch of {len(batch)} rows failed: {str(e)}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        cutoff = time.time() - SNAPSHOT_RETENTION_DAYS * 86400
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM snapshots WHERE ts < ?", (cutoff,)).rowcount
+            if deleted:
+                logger.info(f"Pruned {deleted} snapshots older than {SNAPSHOT_RETENTION_DAYS} days")
+        except sqlite3.Error as e:
+            logger.warning(f"Snapshot pruning failed: {str(e)}")
+
+    # --- Reads ---
+    def ticker_history(self, ticker: str, since: float, until: float | None = None, limit: int = 500) -> list[dict]:
+        """Snapshots for one ticker in [since, until], oldest first."""
+        if not self.ready:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT ts, source, price, change_percent, volume, market_cap FROM snapshots "
+                "WHERE ticker = ? AND ts >= ? AND ts <= ? ORDER BY ts LIMIT ?",
+                (normalize_ticker(ticker), since, until or time.time(), limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def movers(self, since: float, source_prefix: str = "", k: int = 10, order: str = "desc") -> list[dict]:
+        """Tickers ranked by price change between their first and last snapshot since `since`."""
+        if not self.ready:
+            return []
+        direction = "ASC" if order == "asc" else "DESC"
+        # SQLite returns the bare `price` column from the row holding MIN(ts) / MAX(ts)
+        sql = f"""
+            SELECT f.ticker, f.price AS first_price, l.price AS last_price,
+                   f.ts AS first_ts, l.ts AS last_ts,
+                   ROUND((l.price - f.price) * 100.0 / f.price, 4) AS change_percent
+            FROM (SELECT ticker, price, MIN(ts) AS ts FROM snapshots
+                  WHERE ts >= ? AND source LIKE ? AND price IS NOT NULL GROUP BY ticker) f
+            JOIN (SELECT ticker, price, MAX(ts) AS ts FROM snapshots
+                  WHERE ts >= ? AND source LIKE ? AND price IS NOT NULL GROUP BY ticker) l
+              ON l.ticker = f.ticker
+            WHERE l.ts > f.ts AND f.price != 0
+            ORDER BY change_percent {direction}
+            LIMIT ?
+        """
+        pattern = f"{source_prefix}%"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, (since, pattern, since, pattern, k)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+
+snapshot_store = SnapshotStore()
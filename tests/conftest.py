@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# Modules live at the repo root rather than in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The bench's fixture server replays saved TradingView pages
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    from fixture_server import FixtureServer
+    server = FixtureServer("127.0.0.1").start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="module")
+def chrome():
+    from sel import get_driver
+    try:
+        driver = get_driver(headless=True)
+    except Exception as e:
+        pytest.skip(f"Chrome unavailable: {e}")
+    yield driver
+    driver.quit()
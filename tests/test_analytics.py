@@ -0,0 +1,31 @@
+import pytest
+
+from analytics import numeric_columns, parse_number, rank_rows, resolve_column
+
+ROWS = [
+    {"Symbol": "AAA", "Price": "10.00 USD", "Change %": "+1.50%", "Analyst Rating": "Buy"},
+    {"Symbol": "BBB", "Price": "12.00 USD", "Change %": "−2.10%", "Analyst Rating": "Neutral"},
+    {"Symbol": "CCC", "Price": "8.00 USD", "Change %": "+0.40%", "Analyst Rating": "Sell"},
+]
+
+
+def test_parse_number_handles_suffixes_and_unicode_minus():
+    assert parse_number("2.91T USD") == 2.91e12
+    assert parse_number("−1.2%") == -1.2
+    assert parse_number("Buy") != parse_number("Buy")  # NaN
+
+
+def test_rank_rows_orders_by_parsed_values():
+    assert [r["Symbol"] for r in rank_rows(ROWS, "Change %", "desc", 2)] == ["AAA", "CCC"]
+    assert [r["Symbol"] for r in rank_rows(ROWS, "change %", "asc", 1)] == ["BBB"]
+
+
+def test_numeric_columns_skip_text_columns():
+    assert numeric_columns(ROWS) == ["Price", "Change %"]
+
+
+@pytest.mark.parametrize("column", ["bogus", "Analyst Rating", "Symbol"])
+def test_rank_rows_rejects_unknown_or_non_numeric_columns(column):
+    assert resolve_column(ROWS, column) is None
+    with pytest.raises(ValueError, match="numeric columns are: Price, Change %"):
+        rank_rows(ROWS, column)
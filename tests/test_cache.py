@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import cache
+from cache import TTLCache
+from cache_backend import SQLiteBackend
+
+
+def shared_cache(tmp_path, name="table", max_entries=256, max_bytes=1024 * 1024):
+    """A TTLCache on a SQLite file; two of them on one path behave like two workers."""
+    backend = SQLiteBackend(name, max_entries, max_bytes, path=str(tmp_path / "cache.db"))
+    return TTLCache(name, ttl=30, max_entries=max_entries, max_bytes=max_bytes, backend=backend)
+
+
+def test_timed_out_wait_leaves_the_peer_claim(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_LOAD_WAIT", 0.3)
+    peer, worker = shared_cache(tmp_path), shared_cache(tmp_path)
+    assert peer.claim(("load", "k"), 30)
+
+    async def loader():
+        return ["rows"]
+
+    assert asyncio.run(worker.get_or_load("k", loader)) == (["rows"], 0.0)
+    # The peer is still loading, so its claim must survive the waiter's fallback load
+    assert worker.claim(("load", "k"), 30) is None
+
+
+def test_release_ignores_a_claim_retaken_after_expiry(tmp_path):
+    first, second = shared_cache(tmp_path), shared_cache(tmp_path)
+    stale_token = first.claim("job", 0.05)
+    time.sleep(0.1)
+    assert second.claim("job", 30)
+    first.release("job", stale_token)
+    assert first.claim("job", 30) is None
+
+
+def test_shared_backend_io_runs_off_the_event_loop(tmp_path):
+    shared = shared_cache(tmp_path)
+    threads = []
+    backend_get = shared.backend.get
+
+    def recording_get(key):
+        threads.append(threading.get_ident())
+        return backend_get(key)
+
+    shared.backend.get = recording_get
+
+    async def lookup():
+        await shared.aget("k")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(lookup())
+    assert threads and loop_thread not in threads
+
+
+def test_sqlite_backend_enforces_max_bytes(tmp_path):
+    backend = SQLiteBackend("table", max_entries=1000, max_bytes=4000, path=str(tmp_path / "cache.db"))
+    for i in range(40):
+        # Distinct digits keep the values from compressing away
+        backend.set(i, str(10 ** 300 + i * 7919 ** 20), time.time() + i, 60)
+    stats = backend.stats()
+    assert stats["bytes"] <= 4000
+    assert stats["evictions"] > 0
+    assert backend.get(39) is not None
+    assert backend.get(0) is None
+
+
+def test_stale_hit_returns_at_once_and_refreshes_once():
+    memory = TTLCache("table", ttl=10, stale_ttl=60)
+    memory.set("k", ["old"], stored_at=time.time() - 20)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return ["new"]
+
+    async def main():
+        start = time.monotonic()
+        first, second = await asyncio.gather(memory.get_or_load("k", loader), memory.get_or_load("k", loader))
+        elapsed = time.monotonic() - start
+        await asyncio.gather(*[task for task in memory._refreshing.values() if task])
+        return first, second, elapsed
+
+    first, second, elapsed = asyncio.run(main())
+    assert first[0] == second[0] == ["old"]
+    assert elapsed < 0.2
+    assert calls == 1
+    assert memory.stale_hits == 2
+    assert memory.get("k")[0] == ["new"]
+
+
+def test_empty_results_are_not_cached():
+    memory = TTLCache("table", ttl=30)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return []
+
+    assert asyncio.run(memory.get_or_load("k", loader)) == ([], 0.0)
+    assert asyncio.run(memory.get_or_load("k", loader)) == ([], 0.0)
+    assert calls == 2
+    assert memory.get("k") is None
+
+
+def test_memory_backend_evicts_least_recently_used():
+    by_count = TTLCache("table", ttl=30, max_entries=2)
+    by_count.set("a", 1)
+    by_count.set("b", 2)
+    by_count.get("a")
+    by_count.set("c", 3)
+    assert by_count.get("b") is None
+    assert by_count.get("a") is not None and by_count.get("c") is not None
+
+    by_bytes = TTLCache("table", ttl=30, max_bytes=250)
+    for key in ("a", "b", "c"):
+        by_bytes.set(key, "x" * 100)
+    stats = by_bytes.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 250 and stats["evictions"] == 1
+    assert by_bytes.get("a") is None
@@ -0,0 +1,62 @@
+import asyncio
+import os
+
+os.environ.setdefault("GOOGLE_GEMINI_KEY", "test")
+os.environ["PREFETCH_ENABLED"] = "false"
+os.environ["SNAPSHOT_ENABLED"] = "false"
+
+import app  # noqa: E402
+
+
+def ticker_actions(*tickers):
+    actions = []
+    for ticker in tickers:
+        actions += [
+            {"action": "navigate_single", "url": f"https://www.tradingview.com/symbols/{ticker}/"},
+            {"action": "extract_single", "selector": "body", "fields": {}},
+        ]
+    return actions
+
+
+def stub_fetch(monkeypatch, failing=()):
+    """Replace fetch_ticker_group; returns the tickers fetched and the peak concurrency seen."""
+    seen = {"tickers": [], "active": 0, "peak": 0}
+
+    async def fetch(actions, chart=None):
+        ticker = app.symbol_from_actions(actions)
+        seen["tickers"].append(ticker)
+        seen["active"] += 1
+        seen["peak"] = max(seen["peak"], seen["active"])
+        try:
+            await asyncio.sleep(0.02)
+            if ticker in failing:
+                raise RuntimeError(f"{ticker} page did not load")
+            return {"stocks": [{"symbol": ticker, "price": "1.00", "performance": {"1D": "+1%"}}]}
+        finally:
+            seen["active"] -= 1
+
+    monkeypatch.setattr(app, "fetch_ticker_group", fetch)
+    return seen
+
+
+def test_fanout_is_capped(monkeypatch):
+    monkeypatch.setattr(app, "COMPARE_FANOUT_LIMIT", 2)
+    seen = stub_fetch(monkeypatch)
+    response = asyncio.run(app.execute_single_stock(ticker_actions("AAPL", "MSFT", "NVDA", "AMZN", "TSLA")))
+    assert seen["peak"] == 2
+    assert sorted(response["comparison"]) == ["AAPL", "AMZN", "MSFT", "NVDA", "TSLA"]
+
+
+def test_ticker_count_is_capped(monkeypatch):
+    monkeypatch.setattr(app, "COMPARE_MAX_TICKERS", 3)
+    seen = stub_fetch(monkeypatch)
+    response = asyncio.run(app.execute_single_stock(ticker_actions("AAPL", "MSFT", "NVDA", "AMZN", "TSLA")))
+    assert seen["tickers"] == ["AAPL", "MSFT", "NVDA"]
+    assert list(response["comparison"]) == ["AAPL", "MSFT", "NVDA"]
+
+
+def test_one_failing_ticker_does_not_fail_the_comparison(monkeypatch):
+    stub_fetch(monkeypatch, failing={"MSFT"})
+    response = asyncio.run(app.execute_single_stock(ticker_actions("AAPL", "MSFT", "NVDA")))
+    assert list(response["comparison"]) == ["AAPL", "NVDA"]
+    assert response["message"].endswith("Could not fetch: MSFT")
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+os.environ.setdefault("GOOGLE_GEMINI_KEY", "test")
+os.environ["PREFETCH_ENABLED"] = "false"
+os.environ["SNAPSHOT_ENABLED"] = "false"
+
+import app  # noqa: E402
+from snapshots import SnapshotStore, INSERT_SQL, normalize_ticker  # noqa: E402
+
+
+def test_history_reports_disabled_store_without_creating_a_db(monkeypatch, tmp_path):
+    path = tmp_path / "history.db"
+    store = SnapshotStore(path=str(path), enabled=False)
+    store.start()
+    monkeypatch.setattr(app, "snapshot_store", store)
+
+    history = asyncio.run(app.get_ticker_history("NVDA"))
+    movers = asyncio.run(app.get_history_movers(sector="Finance"))
+    assert history["points"] == [] and "disabled" in history["message"]
+    assert movers["data"] == [] and "disabled" in movers["message"]
+    assert store.ticker_history("NVDA", 0) == []
+    assert not path.exists()
+
+
+def test_history_with_zero_first_price(monkeypatch, tmp_path):
+    store = SnapshotStore(path=str(tmp_path / "history.db"), enabled=True)
+    store.start()
+    try:
+        now = time.time()
+        with sqlite3.connect(store.path) as conn:
+            conn.executemany(INSERT_SQL, [
+                (now - 60, "single", "ZERO", 0.0, None, None, None, "{}"),
+                (now - 30, "single", "ZERO", 1.5, None, None, None, "{}"),
+            ])
+        monkeypatch.setattr(app, "snapshot_store", store)
+        history = asyncio.run(app.get_ticker_history("ZERO", hours=1))
+    finally:
+        store.stop()
+    assert history["change"]["change_percent"] is None
+    assert history["message"] == "ZERO moved +1.50 over 2 snapshots"
+
+
+def test_table_cells_and_symbol_urls_share_a_ticker():
+    assert normalize_ticker("AAPL\nApple Inc.") == "AAPL"
+    assert normalize_ticker("NASDAQ-AAPL") == "AAPL"
+    assert normalize_ticker(" nasdaq:aapl ") == "AAPL"
+
+
+def test_reads_close_their_connections(tmp_path):
+    store = SnapshotStore(path=str(tmp_path / "history.db"), enabled=True)
+    store.start()
+    store.stop()
+    opened = []
+    connect = store._connect
+
+    def tracking_connect():
+        opened.append(connect())
+        return opened[-1]
+
+    store._connect = tracking_connect
+    store.ticker_history("AAPL", 0)
+    store.movers(0)
+    assert len(opened) == 2
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_writer_survives_a_malformed_payload(monkeypatch, tmp_path):
+    monkeypatch.setattr("snapshots.SNAPSHOT_FLUSH_INTERVAL", 0.1)
+    store = SnapshotStore(path=str(tmp_path / "history.db"), enabled=True)
+    store.start()
+    try:
+        store.record_sector("Finance", ["not a row"])
+        store.record_sector("Finance", [{"Symbol": "JPM\nJPMorgan", "Price": "200"}])
+        deadline = time.monotonic() + 5
+        while store.written < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        store.stop()
+    assert store.failures == 1
+    assert [row["price"] for row in store.ticker_history("JPM", 0)] == [200.0]
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import lxml.html
+
+from http_engine import HttpEngine, _text
+
+CELL_MARKUP = Path(__file__).parent / "fixtures" / "cell_markup.html"
+
+GAINERS_PATH = "/markets/stocks-usa/market-movers-gainers/"
+
+
+def cell(html: str) -> str:
+    return _text(lxml.html.fragment_fromstring(html, create_parent=False))
+
+
+def test_adjacent_inline_elements_keep_a_separator():
+    assert cell("<td><span>182.50</span><span>USD</span></td>") == "182.50 USD"
+    assert cell("<td>182.50<span>USD</span></td>") == "182.50 USD"
+
+
+def test_block_children_are_separate_lines():
+    assert cell("<td><div>AAPL</div><div>Apple   Inc.</div></td>") == "AAPL\nApple Inc."
+    assert cell("<td>1.2<br>million</td>") == "1.2\nmillion"
+
+
+def test_scripts_and_whitespace_are_dropped():
+    assert cell("<td>\n  <span>+1.20%</span>\n  <script>var x = 1;</script>\n</td>") == "+1.20%"
+
+
+def test_short_movers_page_falls_back(fixture_server):
+    engine = HttpEngine(enabled=True)
+    url = fixture_server.base_url + GAINERS_PATH
+    assert len(engine.scrape_stocks(url, max_stocks=30)) == 30
+    # The fixture renders 30 rows; more than that needs the browser's infinite scroll
+    assert engine.scrape_stocks(url, max_stocks=50) is None
+
+
+def test_failed_page_is_skipped_for_a_while(fixture_server):
+    engine = HttpEngine(enabled=True)
+    url = fixture_server.base_url + "/not-a-page/"
+    assert engine.scrape_stocks(url, max_stocks=5) is None
+    assert engine.scrape_stocks(url, max_stocks=5) is None
+    stats = engine.stats()
+    assert stats["fallbacks"] == 1
+    assert stats["skipped"] == 1
+
+
+def test_engines_agree_on_cell_text(chrome):
+    chrome.get(CELL_MARKUP.as_uri())
+    browser_cells = chrome.execute_script(
+        "return Array.from(document.querySelectorAll('tr.probe td')).map(el => el.innerText.trim());"
+    )
+    root = lxml.html.fromstring(CELL_MARKUP.read_bytes())
+    assert [_text(td) for td in root.cssselect("tr.probe td")] == browser_cells
+
+
+def test_engines_agree_on_movers_rows(chrome, fixture_server):
+    from sel import scrape_stocks
+    url = fixture_server.base_url + GAINERS_PATH
+    chrome.get(url)
+    assert HttpEngine(enabled=True).scrape_stocks(url, max_stocks=30) == scrape_stocks(chrome, max_stocks=30)
@@ -0,0 +1,33 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from llm_client import AsyncLLMClient
+
+
+class FlakyModel:
+    """Fails its first attempts after `attempt_seconds`, like a client retrying on timeout."""
+
+    def __init__(self, failures: int, attempt_seconds: float):
+        self.failures = failures
+        self.attempt_seconds = attempt_seconds
+
+    async def ainvoke(self, value):
+        for _ in range(self.failures):
+            await asyncio.sleep(self.attempt_seconds)
+        return SimpleNamespace(content=value)
+
+
+def test_deadline_leaves_room_for_client_retries():
+    client = AsyncLLMClient(timeout=0.1, deadline=0.5)
+    result = asyncio.run(client.ainvoke(FlakyModel(failures=2, attempt_seconds=0.1), "ok"))
+    assert result.content == "ok"
+    assert client.stats()["completed"] == 1
+
+
+def test_deadline_still_bounds_the_call():
+    client = AsyncLLMClient(timeout=0.05, deadline=0.1)
+    with pytest.raises(asyncio.TimeoutError, match="timed out after 0.1s"):
+        asyncio.run(client.ainvoke(FlakyModel(failures=5, attempt_seconds=0.1), "slow"))
+    assert client.stats()["timeouts"] == 1
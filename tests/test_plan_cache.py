@@ -0,0 +1,36 @@
+from plan_cache import PlanCache
+
+
+def chart_plan(ticker: str, timeframe: str) -> dict:
+    return {"actions_chart": [{"action": "display_chart", "ticker": ticker, "timeframe": timeframe}]}
+
+
+def single_plan(ticker: str) -> dict:
+    url = f"https://www.tradingview.com/symbols/{ticker}/"
+    return {"actions_single": [{"action": "navigate_single", "url": url}]}
+
+
+def test_count_parameter_is_reused():
+    cache = PlanCache(ttl=60)
+    cache.set("Show me top 10 gainers", {"actions": [{"action": "extract", "count": 10}]})
+    assert cache.get("show me top 5 gainers") == {"actions": [{"action": "extract", "count": 5}]}
+
+
+def test_timeframe_number_is_not_shared():
+    cache = PlanCache(ttl=60)
+    cache.set("Adobe chart for 6 months", chart_plan("ADBE", "6M"))
+    assert cache.get("Adobe chart for 3 months") is None
+    assert cache.stats()["skipped"] == 1
+
+
+def test_ticker_number_is_not_shared():
+    cache = PlanCache(ttl=60)
+    cache.set("3M stock price", single_plan("NYSE-MMM"))
+    assert cache.get("5M stock price") is None
+
+
+def test_repeated_count_maps_every_number():
+    cache = PlanCache(ttl=60)
+    plan = {"actions": [{"action": "extract", "count": 5}], "actions_news": [{"action": "extract", "count": 5}]}
+    cache.set("top 5 gainers and 5 news", plan)
+    assert cache.get("top 7 gainers and 3 news") is not None
@@ -0,0 +1,48 @@
+from refine_payload import compact_payload, estimate_tokens, CHARS_PER_TOKEN
+
+
+def sector_payload(rows: int) -> dict:
+    return {
+        "message": "Technology services stocks",
+        "actions": [{"action": "fetch_sector_data"}],
+        "data": [
+            {"Symbol": f"T{i}\nTicker {i} Holdings Inc.", "Price": f"{100 + i}.25 USD", "Change %": f"+{i % 7}.10%",
+             "Volume": f"{i}.5 M", "Market cap": f"{i * 3}.2 B USD", "Analyst Rating": "Buy"}
+            for i in range(rows)
+        ],
+    }
+
+
+def test_large_sector_payload_stays_within_budget():
+    text = compact_payload(sector_payload(300), budget=1500)
+    assert estimate_tokens(text) <= 1500
+    assert len(text) <= 1500 * CHARS_PER_TOKEN
+    assert "(truncated)" not in text
+    assert "fetch_sector_data" not in text
+
+
+def test_omitted_rows_footer():
+    text = compact_payload(sector_payload(300), budget=1500)
+    footer = text.splitlines()[-1]
+    assert footer.startswith("... ") and "more rows omitted" in footer
+    shown = int(footer.split("showing ")[1].split(" of")[0])
+    assert 0 < shown < 300
+    assert footer == f"... {300 - shown} more rows omitted (showing {shown} of 300)"
+
+
+def test_chart_image_fields_are_dropped():
+    stock = {
+        "symbol": "AAPL", "price": "190.10",
+        "chart_image_base64": "iVBORw0KGgo" * 1000,
+        "chart_image_mime": "image/png",
+        "chart_image_url": "/chart_image/abc",
+    }
+    text = compact_payload({"message": "Apple", "stocks": [stock]})
+    assert "AAPL" in text and "190.10" in text
+    assert "chart_image" not in text and "iVBOR" not in text
+
+
+def test_small_payload_is_kept_whole():
+    text = compact_payload(sector_payload(3))
+    assert "omitted" not in text
+    assert all(f"T{i}" in text for i in range(3))
@@ -0,0 +1,48 @@
+from router import route, GAINERS_URL, LOSERS_URL
+
+
+def movers_url(prompt: str):
+    routed = route(prompt)
+    assert routed is not None, prompt
+    intent, plan = routed
+    return intent, plan["actions"][0]["url"], plan["actions"][1]["count"]
+
+
+def test_top_losers_routes_to_losers():
+    assert movers_url("top 5 losers") == ("losers", LOSERS_URL, 5)
+    assert movers_url("Show me the best 10 decliners today") == ("losers", LOSERS_URL, 10)
+
+
+def test_top_gainers_routes_to_gainers():
+    assert movers_url("Show me top 10 gainers") == ("gainers", GAINERS_URL, 10)
+    assert movers_url("worst 3 winners") == ("gainers", GAINERS_URL, 3)
+
+
+def test_adjectives_still_route_without_nouns():
+    assert movers_url("lowest 5 stocks")[0] == "losers"
+    assert movers_url("best performing stocks")[0] == "gainers"
+
+
+def test_gainers_and_losers_together_is_left_to_the_llm():
+    assert route("top gainers and losers") is None
+
+
+def test_count_comes_from_a_keyword_or_the_list_noun():
+    assert movers_url("show me 5 losers") == ("losers", LOSERS_URL, 5)
+    assert movers_url("5 best performing stocks") == ("gainers", GAINERS_URL, 5)
+    intent, plan = route("latest 3 news for tesla")
+    assert intent == "news" and plan["actions_news"][0]["count"] == 3
+
+
+def test_time_spans_and_years_are_left_to_the_llm():
+    assert route("top gainers last 30 days") is None
+    assert route("news for tesla from the last 7 days") is None
+    assert route("best stocks in 2024") is None
+    assert route("apple stock price in 2024") is None
+
+
+def test_chart_time_spans_become_timeframes():
+    intent, plan = route("apple chart 6 months")
+    assert intent == "chart" and plan["actions_chart"][0]["timeframe"] == "6M"
+    # No chart button covers two weeks, so the planner decides
+    assert route("apple chart 2 weeks") is None
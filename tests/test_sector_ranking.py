@@ -0,0 +1,36 @@
+import asyncio
+import os
+
+os.environ.setdefault("GOOGLE_GEMINI_KEY", "test")
+os.environ["PREFETCH_ENABLED"] = "false"
+os.environ["SNAPSHOT_ENABLED"] = "false"
+
+import app  # noqa: E402
+
+ROWS = [
+    {"Symbol": f"S{i}", "Price": f"{10 + i}.00 USD", "Change %": f"+{i}.00%", "Analyst Rating": "Buy"}
+    for i in range(5)
+]
+
+
+def run_sector(monkeypatch, sort_by):
+    async def load(sector, count, browser=None):
+        return [dict(row) for row in ROWS]
+    monkeypatch.setattr(app, "load_sector_rows", load)
+    # Patched per test so the shared module-level cache is restored afterwards
+    monkeypatch.setattr(app.table_cache, "ttl", 0)
+    monkeypatch.setattr(app.table_cache, "stale_ttl", 0)
+    return asyncio.run(app.execute_sector_data("Test sector", 2, sort_by, "desc"))
+
+
+def test_ranked_sector_names_the_column(monkeypatch):
+    response = run_sector(monkeypatch, "change %")
+    assert [r["Symbol"] for r in response["data"]] == ["S4", "S3"]
+    assert response["message"].endswith("ranked by Change % (highest first)")
+
+
+def test_unknown_sort_column_is_an_error_not_a_fake_ranking(monkeypatch):
+    response = run_sector(monkeypatch, "bogus")
+    assert response["data"] == []
+    assert "ranked by" not in response["message"]
+    assert "Numeric columns: Price, Change %" in response["message"]
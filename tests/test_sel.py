@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import sel
+from sel import load_table_rows, scrape_stocks
+
+
+class FakeDriver:
+    def __init__(self, fail: bool = False):
+        self.timeouts = SimpleNamespace(script=30)
+        self.fail = fail
+
+    def set_script_timeout(self, seconds):
+        self.timeouts = SimpleNamespace(script=seconds)
+
+    def execute_async_script(self, *args):
+        if self.fail:
+            raise RuntimeError("script timed out")
+        return {"rows": 42, "rounds": 3}
+
+    def execute_script(self, script):
+        return None
+
+    def find_elements(self, by, selector):
+        return []
+
+
+def test_row_loader_restores_the_script_timeout():
+    driver = FakeDriver()
+    assert load_table_rows(driver, "tbody", max_rounds=100, quiet_ms=1000) == (42, 3)
+    assert driver.timeouts.script == 30
+
+    failing = FakeDriver(fail=True)
+    assert load_table_rows(failing, "tbody", max_rounds=100, quiet_ms=1000) == (0, 0)
+    assert failing.timeouts.script == 30
+
+
+MOVERS_PATH = "/markets/stocks-usa/market-movers-losers/"
+SECTOR_TEMPLATE = "{base}/markets/stocks-usa/sectorandindustry-sector/{{slug}}/"
+
+
+def test_bulk_and_per_element_movers_rows_agree(chrome, fixture_server):
+    chrome.get(fixture_server.base_url + MOVERS_PATH)
+    bulk = scrape_stocks(chrome, max_stocks=20, bulk=True)
+    per_element = scrape_stocks(chrome, max_stocks=20, bulk=False)
+    assert len(bulk) == 20
+    assert bulk == per_element
+
+
+def test_bulk_and_per_element_sector_rows_agree(chrome, fixture_server, monkeypatch):
+    monkeypatch.setattr(sel, "SECTOR_URL_TEMPLATE", SECTOR_TEMPLATE.format(base=fixture_server.base_url))
+    bulk = sel.scrape_sector("Technology services", chrome, count=20)
+    # Without the bulk script, scrape_sector reads headers and cells element by element
+    monkeypatch.setattr(sel, "extract_table_bulk", lambda *args: None)
+    per_element = sel.scrape_sector("Technology services", chrome, count=20)
+    assert len(bulk) == 20
+    assert bulk == per_element
@@ -0,0 +1,77 @@
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_load():
+    flight = SingleFlight("test", enabled=True)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"rows": [1, 2, 3]}
+
+    async def main():
+        return await asyncio.gather(*(flight.do(("movers", "url"), loader) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["executed"] == 1 and flight.stats()["shared"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_copy_result_gives_each_caller_its_own_copy():
+    flight = SingleFlight("test", enabled=True)
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return {"rows": [1]}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", loader, copy_result=True) for _ in range(3)))
+
+    first, second, _ = asyncio.run(main())
+    first["rows"].append(2)
+    assert second == {"rows": [1]}
+
+
+def test_failure_reaches_every_waiter_and_clears_the_key():
+    flight = SingleFlight("test", enabled=True)
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("scrape failed")
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(5)), return_exceptions=True)
+        # The failed work is not reused; the next caller loads again
+        retry = await flight.do("key", lambda: asyncio.sleep(0, result="ok"))
+        return results, retry
+
+    results, retry = asyncio.run(main())
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retry == "ok"
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_disabled_flight_runs_every_call():
+    flight = SingleFlight("test", enabled=False)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(flight.do("key", loader) for _ in range(3)))
+
+    asyncio.run(main())
+    assert calls == 3